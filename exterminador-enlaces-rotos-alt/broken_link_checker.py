@@ -4,79 +4,408 @@ Broken Link Checker - Professional QA Tool
 Autor: Senior QA Automation Engineer
 """
 
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain
+import os
+import sys
+import threading
+import time
+
 from colorama import init, Fore, Style
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
+
+# Módulos compartidos con la versión web (transporte HTTP, extractor, verificación con caché, checkpoints)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'exterminador-enlaces-rotos'))
+from activos import PesoPorPagina, anotar_activo, es_activo
+from checkpoints import Checkpoint
+from extractor import ETIQUETAS_ACTIVOS, ETIQUETAS_ENLACE, REL_ACTIVOS, charset_de, iterar_atributos, url_absoluta
+from fragmentado import iterar_fragmentado
+from normalizacion import IndiceEnlaces, es_verificable, urls_de_peticion
+from salud_hosts import SaludHosts
+from sesion_http import cerrar_sesion, obtener_sesion
+from sitemap import urls_del_sitio
+from verificador import EscaneoDetenido, verificar_enlace
+
+from reporte import SumideroReporte, imprimir_resumen
 
 # Inicializar colores para la consola
 init(autoreset=True)
 
-def verificar_enlaces(url_objetivo):
-    print(f"\n{Fore.CYAN}🔍 Iniciando escaneo en: {url_objetivo}...\n")
-    
-    # 1. Configurar Headers para parecer un navegador real (y no un bot)
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+CONCURRENCIA = int(os.getenv("CHECKER_CONCURRENCIA", "20"))  # enlaces verificados a la vez
+PRESUPUESTO_SEGUNDOS = float(os.getenv("CHECKER_PRESUPUESTO_SEGUNDOS", "600"))  # tiempo total máximo
+REPORTE_CSV = 'reporte_errores_qa.csv'
+CHECKPOINT = 'checkpoint_escaneo.json'
+
+# 1. Configurar Headers para parecer un navegador real (y no un bot)
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class Progreso:
+    """Contador en vivo de enlaces verificados"""
+
+    def __init__(self):
+        self.total = 0
+        self.hechos = 0
+        self.inicio = time.monotonic()
+
+    def etiqueta(self):
+        transcurrido = time.monotonic() - self.inicio
+        return f"{Style.DIM}[{self.hechos}/{self.total} · {transcurrido:.1f}s]{Style.RESET_ALL}"
+
+
+def leer_semillas(ruta):
+    """Lee un archivo con una URL por línea (ignora vacías y comentarios #)"""
+    with open(ruta, encoding='utf-8') as f:
+        return [linea.strip() for linea in f if linea.strip() and not linea.strip().startswith('#')]
+
+
+def imprimir_cadena(resultado, progreso):
+    """Avisa de una cadena de redirecciones larga; retorna su descripción (o None)"""
+    if not resultado.get('cadena_larga'):
+        return None
+    saltos = resultado['redirecciones']
+    print(f"{progreso.etiqueta()} {Fore.YELLOW}↪️ [{saltos} REDIRECCIONES] {resultado['url']} -> {resultado['url_final']}")
+    return f"Cadena de {saltos} redirecciones -> {resultado['url_final']}"
 
+
+def imprimir_peso(resultado, progreso):
+    """Muestra tamaño y tipo de un activo; retorna la descripción si supera el peso máximo (o None)"""
+    if not resultado.get('activo') or resultado['estado'] != 'OK':
+        return None
+    tamano = resultado.get('tamano_bytes')
+    peso = f"{tamano / 1024:.1f} KB" if tamano is not None else "tamaño desconocido"
+    tipo = resultado.get('tipo_contenido') or resultado['categoria']
+    if not resultado.get('pesado'):
+        print(f"{progreso.etiqueta()} {Style.DIM}   ⚖️ {peso} · {tipo}")
+        return None
+    print(f"{progreso.etiqueta()} {Fore.YELLOW}🐘 [ACTIVO PESADO] {resultado['url']} ({peso} · {tipo})")
+    return f"Activo pesado: {peso} ({tipo})"
+
+
+def imprimir_pesos(pesos):
+    """Resumen de peso de los activos por página, de la más pesada a la más liviana"""
+    print(f"\n{Fore.CYAN}⚖️ Peso de los activos por página:")
+    for pagina in pesos.resumen():
+        tipos = ', '.join(f"{tipo} {datos['bytes'] / 1024:.0f} KB"
+                          for tipo, datos in sorted(pagina['por_tipo'].items(), key=lambda t: -t[1]['bytes']))
+        print(f"{Fore.WHITE}  {pagina['pagina']}: {pagina['activos']} activos · "
+              f"{pagina['bytes'] / 1024:.1f} KB ({tipos or 'sin datos'})")
+        extras = []
+        if pagina['rotos']:
+            extras.append(f"{pagina['rotos']} rotos")
+        if pagina['sin_tamano']:
+            extras.append(f"{pagina['sin_tamano']} sin tamaño")
+        if pagina['pesados']:
+            extras.append(f"{len(pagina['pesados'])} pesados")
+        if extras:
+            print(f"{Fore.YELLOW}    {' · '.join(extras)}")
+
+
+def imprimir_resultado(resultado, progreso):
+    """Muestra el estado con colores y retorna la descripción del error (o None)"""
+    link_completo = resultado['url']
+    status = resultado['status']
+
+    # 4. Evaluación del Status Code
+    if status == 200:
+        print(f"{progreso.etiqueta()} {Fore.GREEN}✅ [200 OK] {link_completo}")
+        return None
+    if status == 404:
+        print(f"{progreso.etiqueta()} {Fore.RED}❌ [404 NOT FOUND] {link_completo}")
+        return '404 Not Found'
+    if isinstance(status, int):
+        print(f"{progreso.etiqueta()} {Fore.RED}⚠️ [{status}] {link_completo}")
+        return f'Status {status}'
+    if resultado.get('motivo'):
+        print(f"{progreso.etiqueta()} {Fore.RED}💀 [ERROR CONEXIÓN: {resultado['motivo']}] {link_completo}")
+        return f"Fallo de Conexión ({resultado['motivo']})"
+    print(f"{progreso.etiqueta()} {Fore.RED}💀 [ERROR CONEXIÓN] {link_completo}")
+    return 'Fallo de Conexión'
+
+
+async def extraer_de_pagina(url_objetivo, sesion, activos=False):
+    """
+    Descarga la página y retorna [(etiqueta, enlace absoluto)] (o [] si falla).
+    Con activos incluye imágenes, scripts y hojas de estilo además de los <a>.
+    """
     try:
         # 2. Obtener el HTML de la página principal
-        response = requests.get(url_objetivo, headers=headers, timeout=10)
-        if response.status_code != 200:
-            print(f"{Fore.RED}❌ Error crítico: No se pudo acceder a la web. Status: {response.status_code}")
-            return
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-        etiquetas_a = soup.find_all('a')
-        
-        print(f"{Fore.YELLOW}📦 Se encontraron {len(etiquetas_a)} enlaces. Verificando uno por uno...\n")
-
-        enlaces_rotos = []
-
-        # 3. Bucle para verificar cada enlace
-        for etiqueta in etiquetas_a:
-            link = etiqueta.get('href')
-            
-            # Filtrar enlaces vacíos o anclas internas (#)
-            if not link or link.startswith('#') or link.startswith('javascript:'):
-                continue
+        response = await asyncio.to_thread(sesion.get, url_objetivo, timeout=10)
+    except Exception as e:
+        print(f"{Fore.RED}❌ Error crítico: No se pudo acceder a {url_objetivo}: {e}")
+        return []
+    if response.status_code != 200:
+        print(f"{Fore.RED}❌ Error crítico: No se pudo acceder a {url_objetivo}. Status: {response.status_code}")
+        return []
+
+    # Extractor por eventos: lee los href sin construir el árbol DOM
+    encoding = charset_de(response.headers.get('Content-Type'))
+    if activos:
+        atributos = iterar_atributos(response.content, {**ETIQUETAS_ENLACE, **ETIQUETAS_ACTIVOS}, rel_link=REL_ACTIVOS,
+                                     encoding=encoding)
+    else:
+        atributos = iterar_atributos(response.content, encoding=encoding)
+    enlaces = {}
+    for etiqueta, link in atributos:
+        # Filtrar enlaces vacíos o anclas internas (#)
+        if not link or link.startswith('#') or link.startswith('javascript:'):
+            continue
+        # Convertir enlaces relativos (/contacto) a absolutos (https://miweb.com/contacto)
+        absoluto = url_absoluta(url_objetivo, link)
+        if absoluto is not None:  # un href inválido (http://[::1) no hace perder el resto
+            enlaces.setdefault(absoluto, etiqueta)
+    # Solo http(s): mailto:, tel: y similares no se pueden verificar
+    return [(etiqueta, e) for e, etiqueta in enlaces.items() if es_verificable(e)]
 
-            # Convertir enlaces relativos (/contacto) a absolutos (https://miweb.com/contacto)
-            link_completo = urljoin(url_objetivo, link)
 
+def leer_sitemap(url):
+    """
+    URLs listadas en un sitemap (o en los sitemaps que declara el robots.txt
+    del sitio si url no es un .xml/.xml.gz), respetando robots.txt.
+    Retorna [(url, sitemap)].
+    """
+    es_sitemap = urlparse(url).path.endswith(('.xml', '.xml.gz'))
+    return urls_del_sitio(url, url if es_sitemap else None)
+
+
+async def recolectar(semillas, sesion, ruta_checkpoint, reanudar, sitemaps=(), activos=False):
+    """
+    Retorna el checkpoint del escaneo: el existente si se reanuda o uno nuevo
+    con las URLs canónicas de las páginas semilla y sus ocurrencias
+    ({canónica: [{'href', 'pagina'}]}; los activos llevan además 'etiqueta').
+    Las URLs de los sitemaps se verifican directamente (su página de origen es el sitemap).
+    """
+    if reanudar and os.path.exists(ruta_checkpoint):
+        checkpoint = Checkpoint.cargar(ruta_checkpoint)
+        print(f"{Fore.YELLOW}♻️ Reanudando desde '{ruta_checkpoint}': "
+              f"{len(checkpoint.pendientes())} de {len(checkpoint.enlaces)} enlaces pendientes")
+        return checkpoint
+
+    paginas = await asyncio.gather(*(extraer_de_pagina(url, sesion, activos) for url in semillas))
+    indice = IndiceEnlaces()  # variantes del mismo destino (#fragmento, /, query) -> una verificación
+    for url_objetivo, enlaces in zip(semillas, paginas):
+        recursos = sum(1 for etiqueta, _ in enlaces if etiqueta not in ETIQUETAS_ENLACE)
+        detalle = f" ({recursos} activos)" if activos else ""
+        print(f"{Fore.YELLOW}📦 {url_objetivo}: {len(enlaces)} enlaces{detalle}")
+        for etiqueta, enlace in enlaces:
+            indice.agregar(enlace, url_objetivo, None if etiqueta in ETIQUETAS_ENLACE else etiqueta)
+    for url_sitemap in sitemaps:
+        listadas = await asyncio.to_thread(leer_sitemap, url_sitemap)
+        print(f"{Fore.YELLOW}🗺️ {url_sitemap}: {len(listadas)} URLs en el sitemap")
+        for enlace, origen in listadas:
+            if es_verificable(enlace):
+                indice.agregar(enlace, origen)
+    canonicas = indice.canonicas()
+    print(f"{Fore.YELLOW}🧬 {indice.total_ocurrencias()} enlaces encontrados -> {len(canonicas)} destinos únicos")
+    principal = (semillas or list(sitemaps) or [''])[0]
+    return Checkpoint.nuevo(ruta_checkpoint, principal, {'semillas': semillas, 'sitemaps': list(sitemaps), 'activos': activos},
+                            canonicas, {c: indice.ocurrencias(c) for c in canonicas})
+
+
+async def auditar(semillas, sumidero, concurrencia=CONCURRENCIA, presupuesto=PRESUPUESTO_SEGUNDOS,
+                  ruta_checkpoint=CHECKPOINT, reanudar=False, procesos=1, sitemaps=(), activos=False,
+                  pesos=None):
+    """
+    Audita una o varias páginas semilla.
+    Cada destino canónico se verifica una vez aunque aparezca en varias páginas
+    o con distintas variantes;
+    al agotarse el presupuesto de tiempo se reporta lo verificado hasta ese momento.
+    Cada enlace roto, o con una cadena de redirecciones larga, se escribe en el
+    sumidero (una fila por ocurrencia) apenas se detecta. El progreso queda en un checkpoint para poder reanudar;
+    se elimina cuando el escaneo termina completo. Con procesos > 1 los enlaces
+    se reparten por host entre varios procesos. sitemaps agrega como enlaces a
+    verificar las URLs listadas en esos sitemaps. Con activos también se verifican
+    imágenes, scripts y hojas de estilo midiendo su peso (los que superan
+    ACTIVOS_MAX_BYTES van al reporte) y pesos (PesoPorPagina) acumula el peso
+    de cada página. Retorna (filas escritas, enlaces que quedaron sin verificar).
+    """
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrencia))
+    # Pool propio para las verificaciones: al agotarse el presupuesto se descarta sin esperar
+    # (asyncio.run sí espera al pool por defecto antes de retornar)
+    verificaciones = ThreadPoolExecutor(max_workers=concurrencia + 1)
+    sesion = obtener_sesion(HEADERS)
+    semaforo = asyncio.Semaphore(concurrencia)
+    progreso = Progreso()
+    limite = time.monotonic() + presupuesto
+    salud = SaludHosts()  # un host caído cuesta un timeout, no uno por enlace
+
+    checkpoint = await recolectar(semillas, sesion, ruta_checkpoint, reanudar, sitemaps, activos)
+    ocurrencias = checkpoint.referencias
+    destinos = urls_de_peticion(ocurrencias)  # se pide un href original, no la URL canónica
+    pendientes = checkpoint.pendientes()
+    # Los activos se verifican midiendo tipo y tamaño; los enlaces solo su estado
+    recursos = {e for e in pendientes if es_activo(ocurrencias[e])}
+    if pesos is not None:
+        for resultado in checkpoint.completados().values():
+            pesos.agregar(resultado, ocurrencias[resultado['url']])
+    progreso.total = len(checkpoint.enlaces)
+    progreso.hechos = progreso.total - len(pendientes)
+    print(f"\n{Fore.YELLOW}🔎 Verificando {len(pendientes)} enlaces únicos con concurrencia {concurrencia}...\n")
+
+    # Los resultados llegan por una cola, desde tareas de este proceso o desde los fragmentos
+    cola = asyncio.Queue()
+    detener = threading.Event()
+
+    if procesos > 1:
+        def producir():
             try:
-                # Hacemos la petición al enlace
-                r = requests.get(link_completo, headers=headers, timeout=5)
-                
-                # 4. Evaluación del Status Code
-                if r.status_code == 200:
-                    print(f"{Fore.GREEN}✅ [200 OK] {link_completo}")
-                elif r.status_code == 404:
-                    print(f"{Fore.RED}❌ [404 NOT FOUND] {link_completo}")
-                    enlaces_rotos.append({'URL_Origen': url_objetivo, 'Link_Roto': link_completo, 'Error': '404 Not Found'})
-                else:
-                    print(f"{Fore.RED}⚠️ [{r.status_code}] {link_completo}")
-                    enlaces_rotos.append({'URL_Origen': url_objetivo, 'Link_Roto': link_completo, 'Error': f'Status {r.status_code}'})
-
-            except requests.exceptions.RequestException as e:
-                print(f"{Fore.RED}💀 [ERROR CONEXIÓN] {link_completo}")
-                enlaces_rotos.append({'URL_Origen': url_objetivo, 'Link_Roto': link_completo, 'Error': 'Fallo de Conexión'})
-
-        # 5. Generar Reporte
-        if enlaces_rotos:
-            print(f"\n{Fore.RED}🚨 Se detectaron {len(enlaces_rotos)} enlaces rotos.")
-            df = pd.DataFrame(enlaces_rotos)
-            df.to_csv('reporte_errores_qa.csv', index=False)
-            print(f"{Fore.WHITE}📄 Reporte guardado como: 'reporte_errores_qa.csv'")
+                enlaces = [e for e in pendientes if e not in recursos]
+                for resultado in chain(iterar_fragmentado(enlaces, procesos, concurrencia, detener, salud=salud,
+                                                          destinos=destinos),
+                                       iterar_fragmentado(list(recursos), procesos, concurrencia, detener,
+                                                          medir_peso=True, salud=salud, destinos=destinos)):
+                    loop.call_soon_threadsafe(cola.put_nowait, resultado)
+            except Exception as e:
+                loop.call_soon_threadsafe(cola.put_nowait, e)
+
+        tareas = [loop.run_in_executor(verificaciones, producir)]
+    else:
+        async def verificar(enlace):
+            async with semaforo:
+                try:
+                    resultado = await loop.run_in_executor(verificaciones, partial(
+                        verificar_enlace, enlace, medir_peso=enlace in recursos, salud=salud, detener=detener,
+                        destino=destinos.get(enlace)))
+                except EscaneoDetenido:
+                    return
+            await cola.put(resultado)
+
+        tareas = [asyncio.create_task(verificar(enlace)) for enlace in pendientes]
+
+    filas = 0
+    recibidos = 0
+    completo = False
+    try:
+        while recibidos < len(pendientes):
+            restante = limite - time.monotonic()
+            # Se despierta al menos cada flush_segundos para no retener filas del reporte
+            espera = min(restante, max(sumidero.flush_segundos, 0.1))
+            try:
+                resultado = await asyncio.wait_for(cola.get(), timeout=max(0.0, espera))
+            except asyncio.TimeoutError:
+                if espera >= restante:
+                    raise  # presupuesto agotado
+                sumidero.flush_vencido()
+                continue
+            if isinstance(resultado, Exception):
+                raise resultado
+            recibidos += 1
+            progreso.hechos += 1
+            if resultado['url'] in recursos:
+                resultado = anotar_activo(resultado, ocurrencias[resultado['url']])
+                if pesos is not None:
+                    pesos.agregar(resultado, ocurrencias[resultado['url']])
+            # Un enlace OK que llega tras una cadena larga (o un activo pesado) también va al reporte
+            error = (imprimir_resultado(resultado, progreso) or imprimir_cadena(resultado, progreso)
+                     or imprimir_peso(resultado, progreso))
+            if error:
+                # Una fila por cada ocurrencia: el href tal como aparece en cada página
+                for ocurrencia in ocurrencias[resultado['url']]:
+                    filas += sumidero.escribir({'URL_Origen': ocurrencia['pagina'], 'Link_Roto': ocurrencia['href'], 'Error': error})
+            checkpoint.marcar(resultado)
+            sumidero.flush_vencido()  # aunque lleguen solo enlaces sanos
+        completo = True
+    except asyncio.TimeoutError:
+        print(f"\n{Fore.YELLOW}⏱️ Presupuesto de {presupuesto:.0f}s agotado: "
+              f"{len(pendientes) - recibidos} enlaces sin verificar.")
+    finally:
+        detener.set()
+        for tarea in tareas:
+            tarea.cancel()
+        # Lo que no empezó se cancela; las peticiones en curso ven detener y no siguen
+        verificaciones.shutdown(wait=False, cancel_futures=True)
+        if completo:
+            checkpoint.eliminar()
         else:
+            # Escaneo interrumpido: dejar reporte y checkpoint en disco para --resume
+            sumidero.flush()
+            checkpoint.guardar()
+            print(f"{Fore.YELLOW}💾 Progreso guardado en '{ruta_checkpoint}'. Continúa con --resume")
+
+    return filas, len(pendientes) - recibidos
+
+
+def verificar_enlaces(url_objetivo, concurrencia=CONCURRENCIA, presupuesto=PRESUPUESTO_SEGUNDOS,
+                      salida=REPORTE_CSV, formato=None, anexar=False, resumen=False,
+                      ruta_checkpoint=CHECKPOINT, reanudar=False, procesos=1, sitemaps=(), activos=False):
+    """
+    Audita una o varias URLs (y/o sus sitemaps) y genera el reporte a medida que avanza.
+    anexar agrega las filas a un reporte existente (sin duplicar) en lugar de
+    reescribirlo; reanudar retoma el escaneo desde el checkpoint y, con él,
+    también continúa su reporte.
+    Retorna el código de salida: 0, o 1 si el escaneo quedó incompleto o falló.
+    """
+    semillas = [url_objetivo] if isinstance(url_objetivo, str) else list(url_objetivo)
+    print(f"\n{Fore.CYAN}🔍 Iniciando escaneo en: {', '.join(semillas + list(sitemaps)) or ruta_checkpoint}...\n")
+
+    try:
+        # 5. Generar Reporte (incremental: cada fila se guarda apenas se detecta)
+        # Al retomar desde un checkpoint el reporte también se continúa
+        pesos = PesoPorPagina()
+        with SumideroReporte(salida, formato=formato, anexar=anexar or reanudar) as sumidero:
+            filas, sin_verificar = asyncio.run(auditar(semillas, sumidero, concurrencia, presupuesto,
+                                           ruta_checkpoint, reanudar, procesos, sitemaps, activos, pesos))
+        if len(pesos):
+            imprimir_pesos(pesos)
+
+        if filas:
+            print(f"\n{Fore.RED}🚨 Se detectaron {filas} enlaces rotos, con cadenas de redirección largas o activos pesados.")
+            print(f"{Fore.WHITE}📄 Reporte guardado como: '{sumidero.destino}'")
+            if resumen:
+                print()
+                imprimir_resumen(salida, formato)
+        elif not sin_verificar:
             print(f"\n{Fore.GREEN}✨ ¡Felicidades! No se encontraron enlaces rotos.")
 
+        if sin_verificar:
+            # Sin verificar no es lo mismo que sano: el reporte solo cubre lo que alcanzó a verificarse
+            print(f"\n{Fore.YELLOW}⚠️ Escaneo incompleto: {sin_verificar} enlaces quedaron sin verificar. "
+                  f"Continúa con --resume")
+            return 1
+        return 0
+
     except Exception as e:
         print(f"Error general: {e}")
+        return 1
+    finally:
+        cerrar_sesion()  # libera las conexiones del pool compartido
 
 # --- PUNTO DE ENTRADA ---
 if __name__ == "__main__":
-    url_input = input("Introduce la URL a auditar (ej: https://the-internet.herokuapp.com): ")
-    verificar_enlaces(url_input)
+    parser = argparse.ArgumentParser(description="Exterminador de Enlaces Rotos")
+    parser.add_argument('urls', nargs='*', help='URLs a auditar')
+    parser.add_argument('-a', '--archivo', help='Archivo con una URL semilla por línea')
+    parser.add_argument('-s', '--sitemap', action='append', default=[],
+                        help='Sitemap (.xml o .xml.gz) o sitio cuyos sitemaps de robots.txt se verifican (repetible)')
+    parser.add_argument('--activos', action='store_true',
+                        help='Verificar también imágenes, scripts y hojas de estilo y reportar su peso')
+    parser.add_argument('-c', '--concurrencia', type=int, default=CONCURRENCIA, help='Enlaces verificados a la vez')
+    parser.add_argument('-t', '--presupuesto', type=float, default=PRESUPUESTO_SEGUNDOS, help='Tiempo total máximo en segundos')
+    parser.add_argument('-o', '--salida', default=REPORTE_CSV, help='Archivo del reporte (.csv, .jsonl o .parquet)')
+    parser.add_argument('-f', '--formato', choices=('csv', 'jsonl', 'parquet'), help='Formato del reporte (por defecto según la extensión)')
+    parser.add_argument('--anexar', action='store_true',
+                        help='Agregar las filas al reporte existente (sin duplicarlas) en vez de reescribirlo; '
+                             'no retoma el escaneo (para eso, --resume)')
+    parser.add_argument('-p', '--procesos', type=int, default=1, help='Procesos para repartir los enlaces por host (inventarios muy grandes)')
+    parser.add_argument('--checkpoint', default=CHECKPOINT, help='Archivo de checkpoint del escaneo')
+    parser.add_argument('--resume', action='store_true',
+                        help='Retomar el escaneo interrumpido desde el checkpoint y continuar su reporte')
+    parser.add_argument('--resumen', action='store_true', help='Mostrar un resumen tabular al final (requiere pandas)')
+    args = parser.parse_args()
+
+    semillas = list(args.urls)
+    if args.archivo:
+        semillas += leer_semillas(args.archivo)
+    if not semillas and not args.sitemap and not (args.resume and os.path.exists(args.checkpoint)):
+        semillas = [input("Introduce la URL a auditar (ej: https://the-internet.herokuapp.com): ")]
+
+    sys.exit(verificar_enlaces(semillas, args.concurrencia, args.presupuesto,
+                      salida=args.salida, formato=args.formato, anexar=args.anexar, resumen=args.resumen,
+                      ruta_checkpoint=args.checkpoint, reanudar=args.resume, procesos=args.procesos,
+                      sitemaps=args.sitemap, activos=args.activos))
@@ -0,0 +1,187 @@
+"""
+Reporte incremental de enlaces rotos
+Escribe cada fila apenas se produce (CSV, JSONL u opcionalmente Parquet),
+vacía el buffer cada N filas o T segundos y puede anexar filas a un
+reporte existente sin duplicarlas. Un corte a mitad de escaneo ya no pierde
+lo que se había detectado.
+Un archivo Parquet no admite agregar filas: al anexar, las nuevas van a
+una parte más (reporte.parte2.parquet, reporte.parte3.parquet...).
+"""
+
+import csv
+import glob
+import json
+import os
+import re
+import time
+
+CAMPOS = ['URL_Origen', 'Link_Roto', 'Error']
+FORMATOS = ('csv', 'jsonl', 'parquet')
+
+FLUSH_CADA_FILAS = int(os.getenv("REPORTE_FLUSH_FILAS", "20"))
+FLUSH_CADA_SEGUNDOS = float(os.getenv("REPORTE_FLUSH_SEGUNDOS", "2"))
+
+
+def formato_de(ruta):
+    """Deduce el formato por la extensión del archivo"""
+    extension = os.path.splitext(ruta)[1].lower().lstrip('.')
+    return {'ndjson': 'jsonl', 'json': 'jsonl', 'pq': 'parquet'}.get(extension, extension) or 'csv'
+
+
+def partes_parquet(ruta):
+    """Archivos de un reporte Parquet en orden: ruta y sus partes anexadas (ruta.parteN.ext)"""
+    base, extension = os.path.splitext(ruta)
+    patron = re.compile(re.escape(base) + r'\.parte(\d+)' + re.escape(extension) + '$')
+    numeradas = []
+    for archivo in glob.glob(glob.escape(base) + '.parte*' + glob.escape(extension)):
+        numero = patron.match(archivo)
+        if numero:
+            numeradas.append((int(numero.group(1)), archivo))
+    existentes = [ruta] if os.path.exists(ruta) else []
+    return existentes + [archivo for _, archivo in sorted(numeradas)]
+
+
+def _siguiente_parte(ruta):
+    """Archivo donde van las filas anexadas a un reporte Parquet"""
+    partes = partes_parquet(ruta)
+    if not partes:
+        return ruta
+    base, extension = os.path.splitext(ruta)
+    return f"{base}.parte{len(partes) + 1}{extension}"
+
+
+class SumideroReporte:
+    """Destino de filas del reporte; se abre recién con la primera fila"""
+
+    def __init__(self, ruta, formato=None, campos=None, anexar=False,
+                 flush_filas=FLUSH_CADA_FILAS, flush_segundos=FLUSH_CADA_SEGUNDOS):
+        self.ruta = ruta
+        self.formato = formato or formato_de(ruta)
+        if self.formato not in FORMATOS:
+            raise ValueError(f"Formato de reporte no soportado: {self.formato}")
+        # Archivo que recibe las filas: en Parquet, al anexar, una parte nueva
+        self.destino = _siguiente_parte(ruta) if anexar and self.formato == 'parquet' else ruta
+
+        self.campos = campos or CAMPOS
+        self.anexar = anexar
+        self.flush_filas = flush_filas
+        self.flush_segundos = flush_segundos
+        self.filas_escritas = 0
+        self._pendientes = []
+        self._ultimo_flush = time.monotonic()
+        self._archivo = None
+        self._escritor = None
+        self._claves = self._claves_existentes() if anexar else set()
+
+    def escribir(self, fila):
+        """Agrega una fila; las repetidas (misma clave) se ignoran"""
+        clave = tuple(fila.get(campo) for campo in self.campos[:2])
+        if clave in self._claves:
+            return False
+        self._claves.add(clave)
+        self._pendientes.append(fila)
+        self.filas_escritas += 1
+        if len(self._pendientes) >= self.flush_filas:
+            self.flush()
+        else:
+            self.flush_vencido()
+        return True
+
+    def flush_vencido(self):
+        """
+        Escribe el buffer si pasaron flush_segundos desde el último flush.
+        Quien produce las filas lo llama también mientras no llegan filas
+        nuevas, para que no queden en memoria hasta la próxima.
+        """
+        if time.monotonic() - self._ultimo_flush >= self.flush_segundos:
+            self.flush()
+
+    def flush(self):
+        """Escribe al disco las filas en buffer"""
+        self._ultimo_flush = time.monotonic()
+        if not self._pendientes:
+            return
+        if self._escritor is None:
+            self._abrir()
+
+        if self.formato == 'csv':
+            self._escritor.writerows(self._pendientes)
+        elif self.formato == 'jsonl':
+            self._archivo.writelines(json.dumps(f, ensure_ascii=False) + '\n' for f in self._pendientes)
+        else:
+            import pyarrow as pa
+            columnas = {c: [str(f.get(c, '')) for f in self._pendientes] for c in self.campos}
+            self._escritor.write_table(pa.table(columnas))
+
+        if self._archivo is not None:
+            self._archivo.flush()
+        self._pendientes = []
+
+    def cerrar(self):
+        self.flush()
+        if self.formato == 'parquet' and self._escritor is not None:
+            self._escritor.close()
+        if self._archivo is not None:
+            self._archivo.close()
+        self._archivo = self._escritor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def _abrir(self):
+        if self.formato == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            esquema = pa.schema([(c, pa.string()) for c in self.campos])
+            if not self.anexar:
+                for parte in partes_parquet(self.ruta)[1:]:
+                    os.remove(parte)  # partes anexadas de un reporte anterior que se reescribe
+            self._escritor = pq.ParquetWriter(self.destino, esquema)
+            return
+
+        agregar = self.anexar and os.path.exists(self.ruta) and os.path.getsize(self.ruta) > 0
+        self._archivo = open(self.ruta, 'a' if agregar else 'w', newline='', encoding='utf-8')
+        if self.formato == 'csv':
+            self._escritor = csv.DictWriter(self._archivo, fieldnames=self.campos, extrasaction='ignore')
+            if not agregar:
+                self._escritor.writeheader()
+        else:
+            self._escritor = self._archivo
+
+    def _claves_existentes(self):
+        """Claves de las filas ya presentes en el reporte al que se anexa"""
+        if self.formato == 'parquet':
+            import pyarrow.parquet as pq
+            claves = set()
+            for parte in partes_parquet(self.ruta):
+                tabla = pq.read_table(parte, columns=self.campos[:2]).to_pydict()
+                claves.update(zip(*(tabla[campo] for campo in self.campos[:2])))
+            return claves
+        if not os.path.exists(self.ruta):
+            return set()
+        with open(self.ruta, newline='', encoding='utf-8') as f:
+            if self.formato == 'csv':
+                filas = csv.DictReader(f)
+            else:
+                filas = (json.loads(linea) for linea in f if linea.strip())
+            return {tuple(fila.get(campo) for campo in self.campos[:2]) for fila in filas}
+
+
+def imprimir_resumen(ruta, formato=None):
+    """Resumen tabular del reporte; pandas solo se importa aquí"""
+    import pandas as pd
+
+    formato = formato or formato_de(ruta)
+    if formato == 'csv':
+        df = pd.read_csv(ruta)
+    elif formato == 'jsonl':
+        df = pd.read_json(ruta, lines=True)
+    else:
+        df = pd.concat([pd.read_parquet(parte) for parte in partes_parquet(ruta)], ignore_index=True)
+
+    print(df.groupby('Error').size().sort_values(ascending=False).to_string())
+    print()
+    print(df.groupby('URL_Origen').size().sort_values(ascending=False).to_string())
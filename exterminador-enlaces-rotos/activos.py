@@ -0,0 +1,90 @@
+"""
+Modo activos
+Clasifica las imágenes, scripts y hojas de estilo verificados, marca los
+que superan el peso máximo y arma el resumen de peso de cada página.
+"""
+
+import os
+
+ACTIVOS_MAX_BYTES = int(os.getenv("ACTIVOS_MAX_BYTES", str(500 * 1024)))  # más que esto es 'pesado'
+
+# Categoría por etiqueta cuando el servidor no informa el Content-Type
+CATEGORIA_POR_ETIQUETA = {'img': 'imagen', 'source': 'multimedia', 'script': 'script', 'link': 'css'}
+
+
+def es_activo(ocurrencias):
+    """Un destino es activo si alguna ocurrencia viene de una etiqueta de recurso"""
+    return any(o.get('etiqueta') for o in ocurrencias)
+
+
+def categoria(tipo_contenido, etiqueta=None):
+    """'image/webp' -> 'imagen'; sin tipo conocido usa la etiqueta"""
+    tipo = tipo_contenido or ''
+    if tipo.startswith('image/'):
+        return 'imagen'
+    if tipo == 'text/css':
+        return 'css'
+    if 'javascript' in tipo or 'ecmascript' in tipo:
+        return 'script'
+    if tipo.startswith('font/') or 'font' in tipo:
+        return 'fuente'
+    if tipo.startswith(('video/', 'audio/')):
+        return 'multimedia'
+    return CATEGORIA_POR_ETIQUETA.get(etiqueta, 'otro')
+
+
+def anotar_activo(resultado, ocurrencias):
+    """Agrega activo, categoria y pesado al resultado de un recurso"""
+    etiqueta = next((o['etiqueta'] for o in ocurrencias if o.get('etiqueta')), None)
+    tamano = resultado.get('tamano_bytes')
+    return dict(
+        resultado,
+        activo=True,
+        categoria=categoria(resultado.get('tipo_contenido'), etiqueta),
+        pesado=tamano is not None and tamano > ACTIVOS_MAX_BYTES
+    )
+
+
+class PesoPorPagina:
+    """Acumula el peso de los activos de cada página que los referencia"""
+
+    def __init__(self):
+        self._paginas = {}
+
+    def agregar(self, resultado, ocurrencias=None):
+        """Suma el resultado a cada página que lo usa; ignora lo que no es un activo"""
+        if not resultado.get('activo'):
+            return
+        ocurrencias = ocurrencias if ocurrencias is not None else resultado.get('ocurrencias', [])
+        paginas = dict.fromkeys(o['pagina'] for o in ocurrencias if o.get('etiqueta') and o['pagina'])
+        for pagina in paginas:
+            resumen = self._paginas.setdefault(pagina, {
+                'pagina': pagina, 'activos': 0, 'bytes': 0, 'por_tipo': {},
+                'rotos': 0, 'sin_tamano': 0, 'pesados': []
+            })
+            resumen['activos'] += 1
+            if resultado['estado'] != 'OK':
+                resumen['rotos'] += 1
+                continue
+            tamano = resultado.get('tamano_bytes')
+            if tamano is None:
+                resumen['sin_tamano'] += 1
+                continue
+            resumen['bytes'] += tamano
+            tipo = resumen['por_tipo'].setdefault(resultado.get('categoria', 'otro'), {'activos': 0, 'bytes': 0})
+            tipo['activos'] += 1
+            tipo['bytes'] += tamano
+            if resultado.get('pesado'):
+                resumen['pesados'].append({'url': resultado['url'], 'tamano_bytes': tamano})
+
+    def resumen(self):
+        """Una entrada por página, de la más pesada a la más liviana"""
+        # Copias: el resumen se serializa mientras el escaneo sigue sumando
+        return [
+            dict(r, por_tipo={t: dict(v) for t, v in r['por_tipo'].items()},
+                 pesados=sorted(r['pesados'], key=lambda p: p['tamano_bytes'], reverse=True))
+            for r in sorted(self._paginas.values(), key=lambda r: r['bytes'], reverse=True)
+        ]
+
+    def __len__(self):
+        return len(self._paginas)
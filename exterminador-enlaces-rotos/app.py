@@ -1,50 +1,43 @@
-from flask import Flask, render_template, request, jsonify
-from bs4 import BeautifulSoup
-import requests
-from urllib.parse import urljoin, urlparse
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+import json
 import os
 
-app = Flask(__name__)
+from activos import PesoPorPagina
+from escaneo import recolectar_enlaces, iterar_resultados
+from metricas import TiemposEscaneo, exposicion_prometheus
+from trabajos import obtener_gestor
+from verificador import MAX_ENLACES, ESTADOS_ROTOS, calcular_estadisticas, ContadorEstadisticas
 
-# User-Agent para evitar bloqueos
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
+app = Flask(__name__)
 
-def extraer_enlaces(url):
-    """Extrae todos los enlaces de una URL"""
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        enlaces = []
-        
-        for tag in soup.find_all('a', href=True):
-            enlace = tag['href']
-            enlace_completo = urljoin(url, enlace)
-            enlaces.append(enlace_completo)
-        
-        return list(set(enlaces))  # Eliminar duplicados
-    except Exception as e:
-        return []
+def leer_url(data):
+    """Obtiene la URL del cuerpo de la petición (agrega https:// si falta)"""
+    url = (data or {}).get('url', '').strip()
+    
+    # Agregar http:// si no tiene protocolo
+    if url and not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return url
 
-def verificar_enlace(url):
-    """Verifica si un enlace está roto"""
-    try:
-        response = requests.head(url, headers=HEADERS, timeout=10, allow_redirects=True)
-        status_code = response.status_code
-        
-        if status_code >= 400:
-            return {'url': url, 'status': status_code, 'estado': 'ROTO'}
-        else:
-            return {'url': url, 'status': status_code, 'estado': 'OK'}
-    except requests.exceptions.Timeout:
-        return {'url': url, 'status': 'TIMEOUT', 'estado': 'TIMEOUT'}
-    except requests.exceptions.ConnectionError:
-        return {'url': url, 'status': 'ERROR', 'estado': 'ERROR'}
-    except Exception as e:
-        return {'url': url, 'status': 'ERROR', 'estado': 'ERROR'}
+def validar_opciones(data):
+    """
+    Convierte a entero las opciones numéricas del escaneo (profundidad,
+    max_paginas, max_urls); retorna un mensaje de error o None si son válidas.
+    """
+    for clave, minimo in (('profundidad', 0), ('max_paginas', 1), ('max_urls', 1)):
+        valor = data.get(clave)
+        if valor is None:
+            continue
+        try:
+            if isinstance(valor, bool):
+                raise ValueError(valor)
+            numero = int(str(valor).strip())
+        except ValueError:
+            return f"'{clave}' debe ser un número entero"
+        if numero < minimo:
+            return f"'{clave}' debe ser mayor o igual a {minimo}"
+        data[clave] = numero
+    return None
 
 @app.route('/')
 def index():
@@ -55,19 +48,20 @@ def index():
 def analizar():
     """Analiza una URL y retorna los enlaces rotos"""
     data = request.get_json()
-    url = data.get('url', '').strip()
+    url = leer_url(data)
     
     if not url:
         return jsonify({'error': 'Por favor ingresa una URL válida'}), 400
-    
-    # Agregar http:// si no tiene protocolo
-    if not url.startswith(('http://', 'https://')):
-        url = 'https://' + url
+    error = validar_opciones(data)
+    if error:
+        return jsonify({'error': error}), 400
     
     try:
-        # Extraer enlaces
+        # Extraer enlaces (de la página, de todo el sitio en modo rastreo o de sus sitemaps;
+        # con "activos": true también imágenes, scripts y hojas de estilo)
         print(f"📊 Analizando: {url}")
-        enlaces = extraer_enlaces(url)
+        tiempos = TiemposEscaneo()
+        enlaces, conocidos, referencias = recolectar_enlaces(url, data, tiempos)
         
         if not enlaces:
             return jsonify({
@@ -75,44 +69,155 @@ def analizar():
                 'url_analizada': url
             }), 400
         
-        # Verificar enlaces (limitado a 50 para no sobrecargar)
-        enlaces_limitados = enlaces[:50]
-        resultados = []
-        enlaces_rotos = []
+        # Verificar enlaces en paralelo (hasta el presupuesto configurado);
+        # cada URL única se verifica una sola vez
+        enlaces_limitados = enlaces[:MAX_ENLACES]
+        por_url = {r['url']: r for r in iterar_resultados(enlaces_limitados, conocidos, referencias, tiempos)}
+        resultados = [por_url[e] for e in enlaces_limitados]
+        enlaces_rotos = [r for r in resultados if r['estado'] in ESTADOS_ROTOS]
+        estadisticas = calcular_estadisticas(resultados)
+        total = estadisticas['total']
         
-        for i, enlace in enumerate(enlaces_limitados, 1):
-            print(f"Verificando {i}/{len(enlaces_limitados)}: {enlace}")
-            resultado = verificar_enlace(enlace)
-            resultados.append(resultado)
-            
-            if resultado['estado'] in ['ROTO', 'TIMEOUT', 'ERROR']:
-                enlaces_rotos.append(resultado)
-        
-        # Estadísticas
-        total = len(resultados)
-        rotos = len(enlaces_rotos)
-        ok = total - rotos
-        porcentaje_rotos = (rotos / total * 100) if total > 0 else 0
-        
-        return jsonify({
+        respuesta = {
             'url_analizada': url,
             'total_enlaces': len(enlaces),
+            'total_ocurrencias': sum(len(o) for o in referencias.values()),
             'enlaces_analizados': total,
-            'estadisticas': {
-                'total': total,
-                'ok': ok,
-                'rotos': rotos,
-                'porcentaje_rotos': round(porcentaje_rotos, 2)
-            },
+            'estadisticas': estadisticas,
             'resultados': resultados,
             'enlaces_rotos': enlaces_rotos,
-            'nota': f'Se analizaron los primeros {total} enlaces. Total encontrados: {len(enlaces)}'
-        })
+            'paginas_rastreadas': len(conocidos),
+            'nota': f'Se analizaron los primeros {total} enlaces. Total encontrados: {len(enlaces)}',
+            'timings': tiempos.cerrar().a_dict()
+        }
+        if data.get('activos'):
+            pesos = PesoPorPagina()
+            for resultado in resultados:
+                pesos.agregar(resultado)
+            respuesta['peso_por_pagina'] = pesos.resumen()
+        return jsonify(respuesta)
         
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         return jsonify({'error': f'Error al analizar la URL: {str(e)}'}), 500
 
+@app.route('/analizar/stream', methods=['POST'])
+def analizar_stream():
+    """
+    Igual que /analizar pero responde en NDJSON: una línea por enlace apenas
+    se verifica y una línea final con las estadísticas.
+    """
+    data = request.get_json()
+    url = leer_url(data)
+    
+    if not url:
+        return jsonify({'error': 'Por favor ingresa una URL válida'}), 400
+    error = validar_opciones(data)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    print(f"📊 Analizando (stream): {url}")
+    tiempos = TiemposEscaneo()
+    try:
+        enlaces, conocidos, referencias = recolectar_enlaces(url, data, tiempos)
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return jsonify({'error': f'Error al analizar la URL: {str(e)}'}), 500
+    
+    if not enlaces:
+        return jsonify({
+            'error': 'No se pudieron extraer enlaces de esta URL',
+            'url_analizada': url
+        }), 400
+    
+    enlaces_limitados = enlaces[:MAX_ENLACES]
+    
+    def generar():
+        yield json.dumps({
+            'tipo': 'inicio',
+            'url_analizada': url,
+            'total_enlaces': len(enlaces),
+            'total_ocurrencias': sum(len(o) for o in referencias.values()),
+            'enlaces_a_analizar': len(enlaces_limitados)
+        }) + '\n'
+        
+        # Solo se acumulan contadores: los resultados no se guardan en memoria
+        contador = ContadorEstadisticas()
+        pesos = PesoPorPagina()
+        for resultado in iterar_resultados(enlaces_limitados, conocidos, referencias, tiempos):
+            contador.agregar(resultado)
+            pesos.agregar(resultado)
+            yield json.dumps(dict(resultado, tipo='resultado')) + '\n'
+        
+        fin = {
+            'tipo': 'fin',
+            'url_analizada': url,
+            'enlaces_analizados': contador.total,
+            'estadisticas': contador.resumen(),
+            'paginas_rastreadas': len(conocidos),
+            'timings': tiempos.cerrar().a_dict()
+        }
+        if data.get('activos'):
+            fin['peso_por_pagina'] = pesos.resumen()
+        yield json.dumps(fin) + '\n'
+    
+    return Response(
+        stream_with_context(generar()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/scans', methods=['POST'])
+def crear_scan():
+    """Encola un escaneo en segundo plano y retorna su id (o reanuda uno con resume_job_id)"""
+    data = request.get_json() or {}
+    
+    if data.get('resume_job_id'):
+        try:
+            trabajo = obtener_gestor().reanudar(str(data['resume_job_id']))
+        except (FileNotFoundError, ValueError):
+            return jsonify({'error': 'No hay un checkpoint para ese escaneo'}), 404
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 409
+        return jsonify({
+            'id': trabajo.id,
+            'estado': trabajo.estado,
+            'url_analizada': trabajo.url,
+            'reanudado': True,
+            'consulta': f'/scans/{trabajo.id}'
+        }), 202
+    
+    url = leer_url(data)
+    
+    if not url:
+        return jsonify({'error': 'Por favor ingresa una URL válida'}), 400
+    error = validar_opciones(data)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    trabajo = obtener_gestor().encolar(url, data)
+    return jsonify({
+        'id': trabajo.id,
+        'estado': trabajo.estado,
+        'url_analizada': url,
+        'consulta': f'/scans/{trabajo.id}'
+    }), 202
+
+@app.route('/scans/<trabajo_id>', methods=['GET'])
+def consultar_scan(trabajo_id):
+    """Progreso y resultados parciales de un escaneo (?desde=N para solo los nuevos)"""
+    trabajo = obtener_gestor().obtener(trabajo_id)
+    if trabajo is None:
+        return jsonify({'error': 'Escaneo no encontrado o expirado'}), 404
+    
+    desde = request.args.get('desde', 0, type=int)
+    return jsonify(trabajo.a_dict(desde=max(desde, 0)))
+
+@app.route('/metrics', methods=['GET'])
+def exponer_metricas():
+    """Histogramas de fases y de DNS/conexión/TLS/TTFB en formato de texto de Prometheus"""
+    return Response(exposicion_prometheus(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     print("\n" + "="*60)
@@ -0,0 +1,237 @@
+"""
+Benchmark de rendimiento del escaneo
+Levanta un servidor HTTP simulado (ver servidor_simulado.py) con una mezcla
+configurable de respuestas 200/404/redirección/lentas/colgadas y mide:
+
+  - extracción: extraer_enlaces() sobre una página grande (ms por página)
+  - verificación: verificar_enlace() sin caché sobre los enlaces extraídos
+    (enlaces/s, latencia p50/p95/p99 por verificación y estados)
+  - memoria: pico de RSS del proceso (y del heap de Python con --tracemalloc)
+
+Los resultados se guardan en JSON para comparar versiones.
+
+Uso:
+    python benchmarks/bench_escaneo.py --json bench_actual.json
+    python benchmarks/bench_escaneo.py --mezcla ok=90,roto=10 --enlaces 5000 -w 64
+    python benchmarks/bench_escaneo.py --json nuevo.json --comparar bench_actual.json
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from servidor_simulado import MEZCLA_POR_DEFECTO, iniciar_servidor, parsear_mezcla
+
+
+def percentil(valores, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not valores:
+        return None
+    indice = max(0, min(len(valores) - 1, round(p / 100 * len(valores) + 0.5) - 1))
+    return valores[indice]
+
+
+def pico_rss_mb():
+    """Pico de memoria residente del proceso en MB (None si no se puede medir)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo reporta en KB, macOS en bytes
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def version_del_codigo():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+class Medicion:
+    """Cronómetro de una fase con pico de heap opcional (tracemalloc)"""
+
+    def __init__(self, tracemalloc_activo):
+        self.tracemalloc_activo = tracemalloc_activo
+        self.segundos = 0.0
+        self.pico_heap_mb = None
+
+    def __enter__(self):
+        if self.tracemalloc_activo:
+            tracemalloc.start()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.segundos = time.perf_counter() - self._inicio
+        if self.tracemalloc_activo:
+            self.pico_heap_mb = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+            tracemalloc.stop()
+        return False
+
+
+def medir_extraccion(extraer_enlaces, url_pagina, repeticiones, tracemalloc_activo):
+    """Descarga + parseo de la página; mejor y mediana de N repeticiones"""
+    tiempos = []
+    enlaces = []
+    pico_heap = None
+    for _ in range(repeticiones):
+        with Medicion(tracemalloc_activo) as medicion:
+            enlaces = extraer_enlaces(url_pagina)
+        tiempos.append(medicion.segundos * 1000)
+        if medicion.pico_heap_mb is not None:
+            pico_heap = max(pico_heap or 0, medicion.pico_heap_mb)
+    tiempos.sort()
+    return enlaces, {
+        'repeticiones': repeticiones,
+        'enlaces': len(enlaces),
+        'ms_mejor': round(tiempos[0], 2),
+        'ms_p50': round(percentil(tiempos, 50), 2),
+        'pico_heap_mb': pico_heap
+    }
+
+
+def medir_verificacion(verificar_enlace, enlaces, workers, tracemalloc_activo):
+    """Verifica todos los enlaces sin caché con 'workers' hilos y mide cada verificación"""
+    def verificar_cronometrado(url):
+        inicio = time.perf_counter()
+        resultado = verificar_enlace(url, usar_cache=False)
+        return resultado, time.perf_counter() - inicio
+
+    latencias = []
+    estados = {}
+    with Medicion(tracemalloc_activo) as medicion:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(enlaces)))) as executor:
+            for resultado, segundos in executor.map(verificar_cronometrado, enlaces):
+                latencias.append(segundos * 1000)
+                estados[resultado['estado']] = estados.get(resultado['estado'], 0) + 1
+
+    latencias.sort()
+    return {
+        'enlaces': len(enlaces),
+        'workers': workers,
+        'segundos': round(medicion.segundos, 3),
+        'enlaces_por_segundo': round(len(enlaces) / medicion.segundos, 1) if medicion.segundos else None,
+        'latencia_ms': {
+            'p50': round(percentil(latencias, 50), 2),
+            'p95': round(percentil(latencias, 95), 2),
+            'p99': round(percentil(latencias, 99), 2),
+            'max': round(latencias[-1], 2)
+        },
+        'estados': estados,
+        'pico_heap_mb': medicion.pico_heap_mb
+    }
+
+
+def comparar(actual, anterior):
+    """Imprime las métricas principales contra una ejecución anterior"""
+    metricas = [
+        ('extracción ms (p50)', lambda r: r['extraccion']['ms_p50'], False),
+        ('enlaces/s', lambda r: r['verificacion']['enlaces_por_segundo'], True),
+        ('latencia p50 ms', lambda r: r['verificacion']['latencia_ms']['p50'], False),
+        ('latencia p95 ms', lambda r: r['verificacion']['latencia_ms']['p95'], False),
+        ('pico RSS MB', lambda r: r['memoria']['pico_rss_mb'], False),
+    ]
+    print(f"\n📈 Comparación con {anterior.get('version') or 'ejecución anterior'}")
+    if actual['configuracion'] != anterior.get('configuracion'):
+        print("  ⚠️ La configuración difiere: los números no son directamente comparables")
+    for nombre, obtener, mayor_es_mejor in metricas:
+        try:
+            nuevo, viejo = obtener(actual), obtener(anterior)
+        except (KeyError, TypeError):
+            continue
+        if not nuevo or not viejo:
+            continue
+        cambio = (nuevo - viejo) / viejo * 100
+        mejora = cambio > 0 if mayor_es_mejor else cambio < 0
+        marca = '✅' if mejora or abs(cambio) < 5 else '⚠️'
+        print(f"  {marca} {nombre:<20} {viejo:>10} -> {nuevo:<10} ({cambio:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mezcla', type=parsear_mezcla, default=MEZCLA_POR_DEFECTO,
+                        help='Pesos de cada tipo de respuesta: ok=70,roto=10,redir=10,lento=8,colgado=2')
+    parser.add_argument('--enlaces', type=int, default=2000, help='Enlaces en la página simulada')
+    parser.add_argument('--relleno-kb', type=int, default=512, help='KB de texto extra en la página')
+    parser.add_argument('--lento-ms', type=int, default=200, help='Demora de las respuestas lentas')
+    parser.add_argument('--timeout', type=float, default=1.0, help='VERIFICADOR_TIMEOUT para el benchmark')
+    parser.add_argument('-w', '--workers', type=int, default=32, help='Verificaciones simultáneas')
+    parser.add_argument('-n', '--repeticiones', type=int, default=3, help='Repeticiones de la extracción')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='Medir también el pico del heap de Python (agrega overhead a los tiempos)')
+    parser.add_argument('--json', help='Guardar los resultados en este archivo')
+    parser.add_argument('--comparar', help='JSON de una ejecución anterior para comparar')
+    args = parser.parse_args()
+
+    # La configuración se lee al importar: fijarla antes. Sin límite de tasa por host por
+    # defecto, porque todo el tráfico va al mismo host simulado (respeta el entorno si ya está).
+    os.environ['VERIFICADOR_TIMEOUT'] = str(args.timeout)
+    os.environ.setdefault('PLANIFICADOR_PETICIONES_POR_SEGUNDO', '0')
+    os.environ.setdefault('PLANIFICADOR_CONCURRENCIA_POR_HOST', str(args.workers))
+    os.environ.setdefault('HTTP_MAX_CONEXIONES_POR_HOST', str(args.workers))
+    from crawler import extraer_enlaces
+    from verificador import verificar_enlace
+
+    proceso, url_base = iniciar_servidor(args.mezcla, args.lento_ms, colgado_s=args.timeout * 3)
+    try:
+        url_pagina = f"{url_base}/pagina?enlaces={args.enlaces}&relleno_kb={args.relleno_kb}"
+        print(f"🧪 Servidor simulado en {url_base} · mezcla {args.mezcla}")
+
+        enlaces, extraccion = medir_extraccion(extraer_enlaces, url_pagina, args.repeticiones, args.tracemalloc)
+        print(f"📄 Extracción: {extraccion['enlaces']} enlaces en {extraccion['ms_p50']} ms (p50)")
+
+        verificacion = medir_verificacion(verificar_enlace, enlaces, args.workers, args.tracemalloc)
+        latencia = verificacion['latencia_ms']
+        print(f"🔎 Verificación: {verificacion['enlaces']} enlaces en {verificacion['segundos']} s "
+              f"-> {verificacion['enlaces_por_segundo']} enlaces/s")
+        print(f"   Latencia p50 {latencia['p50']} ms · p95 {latencia['p95']} ms · p99 {latencia['p99']} ms")
+        print(f"   Estados: {verificacion['estados']}")
+    finally:
+        proceso.terminate()
+
+    resultados = {
+        'version': version_del_codigo(),
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'configuracion': {
+            'mezcla': args.mezcla,
+            'enlaces': args.enlaces,
+            'relleno_kb': args.relleno_kb,
+            'lento_ms': args.lento_ms,
+            'timeout': args.timeout,
+            'workers': args.workers,
+            'tracemalloc': args.tracemalloc
+        },
+        'extraccion': extraccion,
+        'verificacion': verificacion,
+        'memoria': {'pico_rss_mb': pico_rss_mb()}
+    }
+    print(f"💾 Pico de memoria (RSS): {resultados['memoria']['pico_rss_mb']} MB")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(resultados, json.load(f))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark del extractor de enlaces
+Compara BeautifulSoup + html.parser (ruta anterior) contra el extractor por
+eventos (lxml y fallback de la librería estándar).
+Antes de medir verifica que las dos rutas del extractor decodifiquen los
+href no ASCII igual que un navegador (charset del header HTTP, <meta
+charset> o UTF-8).
+
+Uso:
+    python benchmarks/bench_extractor.py                      # página sintética grande
+    python benchmarks/bench_extractor.py pagina.html https://www.python.org/
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from extractor import charset_de, extraer_urls, etree
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+
+def pagina_sintetica(n_enlaces=20000):
+    """HTML con estructura realista: navegación, párrafos, imágenes y scripts"""
+    bloques = []
+    for i in range(n_enlaces):
+        bloques.append(
+            f'<div class="card"><h3>Producto {i}</h3><p>Texto de relleno para el '
+            f'producto {i} con <b>formato</b> y <em>énfasis</em>.</p>'
+            f'<a href="/producto/{i}?ref=lista#top" class="btn">Ver</a>'
+            f'<img src="/img/{i}.jpg" alt="foto {i}"></div>'
+        )
+    return ('<!DOCTYPE html><html><head><title>Bench</title>'
+            '<link rel="stylesheet" href="/css/main.css"><script src="/js/app.js"></script>'
+            '</head><body>' + ''.join(bloques) + '</body></html>').encode('utf-8')
+
+
+def cargar(origen):
+    """(bytes, charset del header HTTP o None)"""
+    if origen.startswith(('http://', 'https://')):
+        import requests
+        response = requests.get(origen, timeout=30)
+        return response.content, charset_de(response.headers.get('Content-Type'))
+    with open(origen, 'rb') as f:
+        return f.read(), None
+
+
+def comprobar_codificacion():
+    """Un href no ASCII sale igual con cada ruta del extractor, declare o no el charset la página"""
+    casos = [
+        ('UTF-8 sin <meta charset> ni header', '<a href="/canción">x</a>'.encode('utf-8'), None),
+        ('Latin-1 solo en el header', '<a href="/canción">x</a>'.encode('latin-1'), 'ISO-8859-1'),
+        ('Latin-1 en <meta charset>', '<meta charset="iso-8859-1"><a href="/canción">x</a>'.encode('latin-1'), None),
+        ('el header manda sobre el <meta>', '<meta charset="utf-8"><a href="/canción">x</a>'.encode('latin-1'), 'latin1'),
+    ]
+    for usar_lxml in ([True] if etree is not None else []) + [False]:
+        for caso, html, charset in casos:
+            urls = extraer_urls(html, 'https://ejemplo.com/', usar_lxml=usar_lxml, encoding=charset)
+            assert urls == ['https://ejemplo.com/canción'], f'{caso} (lxml={usar_lxml}): {urls}'
+    print("✅ Codificación: los href no ASCII se leen bien con cada ruta del extractor")
+
+
+def extraer_bs4(html, url_base, charset=None):
+    """Ruta anterior de extraer_enlaces()"""
+    soup = BeautifulSoup(html, 'html.parser', from_encoding=charset)
+    enlaces = [tag['href'] for tag in soup.find_all('a', href=True)]
+    return list(dict.fromkeys(enlaces))
+
+
+def medir(funcion, html, url_base, charset, repeticiones):
+    """Mejor tiempo de N repeticiones (ms) y cantidad de enlaces"""
+    mejor = float('inf')
+    enlaces = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        enlaces = funcion(html, url_base, charset)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000, len(enlaces)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paginas', nargs='*', help='Archivos HTML o URLs a medir')
+    parser.add_argument('-n', '--repeticiones', type=int, default=5)
+    parser.add_argument('--enlaces-sinteticos', type=int, default=20000)
+    parser.add_argument('--json', help='Guardar los resultados en este archivo')
+    args = parser.parse_args()
+
+    comprobar_codificacion()
+    paginas = [(p, *cargar(p)) for p in args.paginas] or [('sintetica', pagina_sintetica(args.enlaces_sinteticos), None)]
+
+    candidatos = []
+    if BeautifulSoup is not None:
+        candidatos.append(('bs4_html_parser', extraer_bs4))
+    if etree is not None:
+        candidatos.append(('extractor_lxml', lambda h, u, c: extraer_urls(h, u, usar_lxml=True, encoding=c)))
+    candidatos.append(('extractor_stdlib', lambda h, u, c: extraer_urls(h, u, usar_lxml=False, encoding=c)))
+
+    resultados = []
+    for nombre_pagina, html, charset in paginas:
+        print(f"\n📄 {nombre_pagina} ({len(html) / 1024:.0f} KB)")
+        base = None
+        for nombre, funcion in candidatos:
+            ms, enlaces = medir(funcion, html, 'https://ejemplo.com/', charset, args.repeticiones)
+            base = base or ms
+            print(f"  {nombre:<18} {ms:9.1f} ms  {enlaces:6d} enlaces  x{base / ms:.1f}")
+            resultados.append({'pagina': nombre_pagina, 'bytes': len(html), 'metodo': nombre,
+                               'ms': round(ms, 2), 'enlaces': enlaces})
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(resultados, f, indent=2)
+        print(f"\n💾 Resultados guardados en {args.json}")
+
+
+if __name__ == '__main__':
+    main()
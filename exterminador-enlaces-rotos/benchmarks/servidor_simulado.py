@@ -0,0 +1,137 @@
+"""
+Servidor HTTP simulado para benchmarks
+Corre en un proceso aparte (no compite por la CPU ni la memoria que se mide)
+y responde según la ruta:
+
+    /ok/<i>        200
+    /roto/<i>      404
+    /redir/<i>     301 -> /ok/<i>
+    /lento/<i>     200 tras 'lento_ms'
+    /colgado/<i>   200 tras 'colgado_s' (pensado para superar el timeout)
+    /pagina        HTML grande con 'enlaces' enlaces repartidos según la mezcla
+"""
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import multiprocessing
+import time
+
+TIPOS = ('ok', 'roto', 'redir', 'lento', 'colgado')
+MEZCLA_POR_DEFECTO = {'ok': 70, 'roto': 10, 'redir': 10, 'lento': 8, 'colgado': 2}
+
+
+def parsear_mezcla(texto):
+    """'ok=70,roto=10' -> {'ok': 70, 'roto': 10}"""
+    mezcla = {}
+    for parte in texto.split(','):
+        tipo, _, peso = parte.partition('=')
+        tipo = tipo.strip()
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo de respuesta desconocido: {tipo!r} (válidos: {', '.join(TIPOS)})")
+        mezcla[tipo] = int(peso)
+    return mezcla
+
+
+def ciclo_de_mezcla(mezcla):
+    """
+    Secuencia determinista de tipos que respeta las proporciones,
+    intercalada para que los lentos no queden todos juntos al final.
+    """
+    total = sum(mezcla.values())
+    ciclo = []
+    acumulado = dict.fromkeys(mezcla, 0.0)
+    for _ in range(total):
+        for tipo, peso in mezcla.items():
+            acumulado[tipo] += peso / total
+        elegido = max(acumulado, key=acumulado.get)
+        acumulado[elegido] -= 1
+        ciclo.append(elegido)
+    return ciclo
+
+
+def pagina_html(enlaces, mezcla, relleno_kb=0):
+    """HTML con tarjetas de producto; cada enlace apunta a una ruta del servidor"""
+    ciclo = ciclo_de_mezcla(mezcla)
+    relleno = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 18  # ~1 KB
+    bloques = []
+    for i in range(enlaces):
+        bloques.append(
+            f'<div class="card"><h3>Producto {i}</h3><p>Descripción del producto {i} '
+            f'con <b>formato</b>.</p><a href="/{ciclo[i % len(ciclo)]}/{i}" class="btn">Ver</a>'
+            f'<img src="/img/{i}.jpg" alt="foto {i}"></div>'
+        )
+    bloques.extend(f'<p>{relleno}</p>' for _ in range(relleno_kb))
+    return ('<!DOCTYPE html><html><head><title>Bench</title>'
+            '<link rel="stylesheet" href="/css/main.css"><script src="/js/app.js"></script>'
+            '</head><body>' + ''.join(bloques) + '</body></html>').encode('utf-8')
+
+
+class ManejadorSimulado(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, como un servidor real
+    lento_ms = 200
+    colgado_s = 30
+    mezcla = MEZCLA_POR_DEFECTO
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self._responder(cuerpo=False)
+
+    def do_GET(self):
+        self._responder(cuerpo=True)
+
+    def _responder(self, cuerpo):
+        partes = urlsplit(self.path)
+        tipo = partes.path.strip('/').split('/', 1)[0]
+
+        if tipo == 'pagina':
+            query = parse_qs(partes.query)
+            contenido = pagina_html(int(query.get('enlaces', ['1000'])[0]), self.mezcla,
+                                    int(query.get('relleno_kb', ['0'])[0]))
+            return self._enviar(200, contenido, 'text/html; charset=utf-8', cuerpo)
+        if tipo == 'roto':
+            return self._enviar(404, b'no existe', 'text/plain', cuerpo)
+        if tipo == 'redir':
+            return self._enviar(301, b'', 'text/plain', cuerpo,
+                                {'Location': partes.path.replace('/redir/', '/ok/', 1)})
+        if tipo == 'lento':
+            time.sleep(self.lento_ms / 1000)
+        elif tipo == 'colgado':
+            time.sleep(self.colgado_s)
+        self._enviar(200, b'ok', 'text/plain', cuerpo)
+
+    def _enviar(self, status, contenido, tipo_contenido, cuerpo, extra=None):
+        self.send_response(status)
+        self.send_header('Content-Type', tipo_contenido)
+        self.send_header('Content-Length', str(len(contenido)))
+        for nombre, valor in (extra or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        if cuerpo:
+            try:
+                self.wfile.write(contenido)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # el cliente abandonó la petición (timeout)
+
+
+def _servir(conexion, host, mezcla, lento_ms, colgado_s):
+    ManejadorSimulado.mezcla = mezcla
+    ManejadorSimulado.lento_ms = lento_ms
+    ManejadorSimulado.colgado_s = colgado_s
+    servidor = ThreadingHTTPServer((host, 0), ManejadorSimulado)
+    servidor.daemon_threads = True
+    servidor.request_queue_size = 1024
+    conexion.send(servidor.server_address[1])
+    servidor.serve_forever()
+
+
+def iniciar_servidor(mezcla=None, lento_ms=200, colgado_s=30, host='127.0.0.1'):
+    """Arranca el servidor en otro proceso; retorna (proceso, url_base)"""
+    contexto = multiprocessing.get_context('spawn')
+    receptor, emisor = contexto.Pipe(duplex=False)
+    proceso = contexto.Process(target=_servir, args=(emisor, host, mezcla or MEZCLA_POR_DEFECTO, lento_ms, colgado_s),
+                               daemon=True)
+    proceso.start()
+    puerto = receptor.recv()
+    return proceso, f"http://{host}:{puerto}"
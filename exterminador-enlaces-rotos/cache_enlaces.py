@@ -0,0 +1,218 @@
+"""
+Caché de estados de enlaces
+LRU en memoria con TTL según el resultado y respaldo opcional en SQLite,
+compartida por la app web y el CLI para que los re-escaneos no repitan
+peticiones a enlaces ya verificados.
+También guarda las cadenas de redirección conocidas, para resolver sin
+recorrerlas de nuevo los enlaces que caen en cualquiera de sus saltos.
+"""
+
+from collections import OrderedDict
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from normalizacion import canonizar_url
+
+MAX_ENTRADAS = int(os.getenv("CACHE_ENLACES_MAX_ENTRADAS", "10000"))
+RUTA_DB = os.getenv("CACHE_ENLACES_DB", "")  # vacío = solo memoria
+
+# TTL en segundos por tipo de resultado: lo sano dura mucho, lo transitorio poco
+TTL_OK = float(os.getenv("CACHE_TTL_OK", "3600"))
+TTL_ROTO = float(os.getenv("CACHE_TTL_ROTO", "600"))
+TTL_ERROR_SERVIDOR = float(os.getenv("CACHE_TTL_ERROR_SERVIDOR", "60"))
+TTL_TIMEOUT = float(os.getenv("CACHE_TTL_TIMEOUT", "30"))
+TTL_REDIRECCION = float(os.getenv("CACHE_TTL_REDIRECCION", "3600"))
+
+
+def ttl_para(resultado):
+    """Segundos que un resultado puede reutilizarse"""
+    status = resultado.get('status')
+    if not isinstance(status, int):
+        return TTL_TIMEOUT
+    if status < 400:
+        return TTL_OK
+    if status in (429, 503) or status >= 500:
+        return TTL_ERROR_SERVIDOR
+    return TTL_ROTO
+
+
+class CacheEnlaces:
+    """LRU thread-safe de resultados de verificación con expiración por entrada"""
+
+    def __init__(self, max_entradas=MAX_ENTRADAS, ruta_db=None):
+        self.max_entradas = max_entradas
+        # url -> (expira, resultado, validadores). Las entradas vencidas se conservan
+        # para reutilizar ETag/Last-Modified en peticiones condicionales.
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if ruta_db:
+            self._db = sqlite3.connect(ruta_db, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS enlaces (url TEXT PRIMARY KEY, resultado TEXT NOT NULL, "
+                "expira REAL NOT NULL, validadores TEXT)"
+            )
+            try:
+                # Bases creadas antes de guardar validadores
+                self._db.execute("ALTER TABLE enlaces ADD COLUMN validadores TEXT")
+            except sqlite3.OperationalError:
+                pass
+            self._db.commit()
+
+    def obtener(self, url):
+        """Retorna una copia del resultado vigente o None"""
+        with self._lock:
+            entrada = self._leer(url)
+            if entrada is None or entrada[0] < time.time():
+                return None
+            return dict(entrada[1])
+
+    def obtener_vencido(self, url):
+        """Retorna (resultado, validadores) aunque el TTL haya expirado; (None, {}) si no existe"""
+        with self._lock:
+            entrada = self._leer(url)
+            if entrada is None:
+                return None, {}
+            return dict(entrada[1]), dict(entrada[2])
+
+    def guardar(self, resultado, validadores=None):
+        """Guarda el resultado de un enlace con el TTL que le corresponde"""
+        url = resultado['url']
+        entrada = (time.time() + ttl_para(resultado), dict(resultado), dict(validadores or {}))
+        with self._lock:
+            self._insertar(url, entrada)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO enlaces (url, resultado, expira, validadores) VALUES (?, ?, ?, ?)",
+                    (url, json.dumps(entrada[1]), entrada[0], json.dumps(entrada[2]))
+                )
+                self._db.commit()
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM enlaces")
+                self._db.commit()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _leer(self, url):
+        """Busca en memoria y, si falta, en SQLite; marca la entrada como usada"""
+        entrada = self._entradas.get(url)
+        if entrada is None and self._db is not None:
+            fila = self._db.execute(
+                "SELECT expira, resultado, validadores FROM enlaces WHERE url = ?", (url,)
+            ).fetchone()
+            if fila:
+                entrada = (fila[0], json.loads(fila[1]), json.loads(fila[2] or '{}'))
+        if entrada is not None:
+            self._insertar(url, entrada)
+        return entrada
+
+    def _insertar(self, url, entrada):
+        self._entradas[url] = entrada
+        self._entradas.move_to_end(url)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)  # expulsar el menos usado
+
+
+class CacheRedirecciones:
+    """
+    LRU thread-safe de cadenas de redirección: cada salto (URL canónica) apunta
+    al resto de la cadena y a la URL final. Respaldo opcional en SQLite.
+    """
+
+    def __init__(self, max_entradas=MAX_ENTRADAS, ruta_db=None, ttl=TTL_REDIRECCION):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._entradas = OrderedDict()  # salto -> (expira, cadena restante, url final)
+        self._lock = threading.Lock()
+        self._db = None
+        if ruta_db:
+            self._db = sqlite3.connect(ruta_db, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS redirecciones (url TEXT PRIMARY KEY, cadena TEXT NOT NULL, "
+                "url_final TEXT NOT NULL, expira REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def registrar(self, cadena, url_final):
+        """
+        Registra una cadena [{'url', 'status'}, ...] que termina en url_final:
+        cada salto queda asociado a los saltos que faltan desde él.
+        """
+        expira = time.time() + self.ttl
+        filas = []
+        with self._lock:
+            for i, salto in enumerate(cadena):
+                entrada = (expira, [dict(s) for s in cadena[i:]], url_final)
+                self._insertar(canonizar_url(salto['url']), entrada)
+                filas.append((canonizar_url(salto['url']), json.dumps(entrada[1]), url_final, expira))
+            if self._db is not None and filas:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO redirecciones (url, cadena, url_final, expira) VALUES (?, ?, ?, ?)",
+                    filas
+                )
+                self._db.commit()
+
+    def obtener(self, url):
+        """Retorna (cadena restante, url final) si la URL es un salto conocido y vigente; si no, None"""
+        url = canonizar_url(url)
+        with self._lock:
+            entrada = self._entradas.get(url)
+            if entrada is None and self._db is not None:
+                fila = self._db.execute(
+                    "SELECT expira, cadena, url_final FROM redirecciones WHERE url = ?", (url,)
+                ).fetchone()
+                if fila:
+                    entrada = (fila[0], json.loads(fila[1]), fila[2])
+            if entrada is None or entrada[0] < time.time():
+                return None
+            self._insertar(url, entrada)
+            return [dict(s) for s in entrada[1]], entrada[2]
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM redirecciones")
+                self._db.commit()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _insertar(self, url, entrada):
+        self._entradas[url] = entrada
+        self._entradas.move_to_end(url)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+
+
+_cache = None
+_cache_redirecciones = None
+_lock_global = threading.Lock()
+
+
+def obtener_cache():
+    """Retorna la caché compartida del proceso (la crea la primera vez)"""
+    global _cache
+    if _cache is None:
+        with _lock_global:
+            if _cache is None:
+                _cache = CacheEnlaces(ruta_db=RUTA_DB or None)
+    return _cache
+
+
+def obtener_cache_redirecciones():
+    """Retorna la caché de redirecciones del proceso (la crea la primera vez)"""
+    global _cache_redirecciones
+    if _cache_redirecciones is None:
+        with _lock_global:
+            if _cache_redirecciones is None:
+                _cache_redirecciones = CacheRedirecciones(ruta_db=RUTA_DB or None)
+    return _cache_redirecciones
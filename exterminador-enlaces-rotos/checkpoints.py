@@ -0,0 +1,111 @@
+"""
+Checkpoints de escaneo
+Guarda en disco la frontera de verificación (enlaces pendientes), los
+enlaces ya verificados con su resultado y las páginas de origen, para
+retomar un escaneo interrumpido exactamente donde quedó.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+VERSION = 1
+DIRECTORIO = os.getenv("CHECKPOINTS_DIR", "checkpoints")
+GUARDAR_CADA_RESULTADOS = int(os.getenv("CHECKPOINT_CADA_RESULTADOS", "25"))
+GUARDAR_CADA_SEGUNDOS = float(os.getenv("CHECKPOINT_CADA_SEGUNDOS", "5"))
+
+
+def ruta_trabajo(trabajo_id, directorio=None):
+    """Ruta del checkpoint de un trabajo web (el id debe ser un uuid hex)"""
+    if not re.fullmatch(r'[0-9a-f]{32}', trabajo_id):
+        raise ValueError(f"Id de trabajo inválido: {trabajo_id!r}")
+    return os.path.join(directorio or DIRECTORIO, f"{trabajo_id}.json")
+
+
+class Checkpoint:
+    """Estado persistente de un escaneo; thread-safe"""
+
+    def __init__(self, ruta, datos):
+        self.ruta = ruta
+        self.datos = datos
+        self._sin_guardar = 0
+        self._ultimo_guardado = time.monotonic()
+        self._lock = threading.Lock()
+        self._lock_escritura = threading.Lock()  # un solo guardado a la vez, en orden
+
+    @classmethod
+    def nuevo(cls, ruta, url, opciones, enlaces, referencias=None, **extra):
+        """Crea el checkpoint de un escaneo recién recolectado y lo guarda"""
+        checkpoint = cls(ruta, {
+            **extra,
+            'version': VERSION,
+            'url': url,
+            'opciones': opciones,
+            'creado': time.time(),
+            'enlaces': list(enlaces),
+            'referencias': referencias or {},
+            'completados': {}
+        })
+        checkpoint.guardar()
+        return checkpoint
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Lee un checkpoint; FileNotFoundError si no existe"""
+        with open(ruta, encoding='utf-8') as f:
+            datos = json.load(f)
+        if datos.get('version') != VERSION:
+            raise ValueError(f"Versión de checkpoint no soportada: {datos.get('version')}")
+        return cls(ruta, datos)
+
+    @property
+    def enlaces(self):
+        return self.datos['enlaces']
+
+    @property
+    def referencias(self):
+        return self.datos['referencias']
+
+    def completados(self):
+        """Copia de {url: resultado} de los enlaces ya verificados"""
+        with self._lock:
+            return dict(self.datos['completados'])
+
+    def pendientes(self):
+        """Frontera: enlaces aún sin verificar, en el orden original"""
+        with self._lock:
+            completados = self.datos['completados']
+            return [e for e in self.datos['enlaces'] if e not in completados]
+
+    def marcar(self, resultado):
+        """Registra un resultado; guarda cada N resultados o T segundos"""
+        with self._lock:
+            self.datos['completados'][resultado['url']] = resultado
+            self._sin_guardar += 1
+            toca_guardar = (self._sin_guardar >= GUARDAR_CADA_RESULTADOS
+                            or time.monotonic() - self._ultimo_guardado >= GUARDAR_CADA_SEGUNDOS)
+        if toca_guardar:
+            self.guardar()
+
+    def guardar(self):
+        """Escritura atómica: archivo temporal + os.replace"""
+        with self._lock_escritura:
+            with self._lock:
+                contenido = json.dumps(self.datos, ensure_ascii=False)
+                self._sin_guardar = 0
+                self._ultimo_guardado = time.monotonic()
+            directorio = os.path.dirname(os.path.abspath(self.ruta))
+            os.makedirs(directorio, exist_ok=True)
+            descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+                f.write(contenido)
+            os.replace(temporal, self.ruta)
+
+    def eliminar(self):
+        try:
+            os.remove(self.ruta)
+        except FileNotFoundError:
+            pass
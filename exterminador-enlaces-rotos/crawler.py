@@ -0,0 +1,190 @@
+"""
+Extracción de enlaces y rastreo recursivo del mismo origen
+Recorre el sitio en anchura (BFS) con una frontera sin duplicados,
+un conjunto de visitados por URL canónica y descargas de páginas en paralelo.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlparse
+import os
+
+from extractor import (ETIQUETAS_ACTIVOS, ETIQUETAS_ENLACE, REL_ACTIVOS, charset_de, extraer_urls, iterar_atributos,
+                       url_absoluta)
+from metricas import fase
+from normalizacion import IndiceEnlaces, canonizar_url, es_verificable, url_de_peticion
+from planificador import obtener_planificador
+from sesion_http import obtener_sesion
+from verificador import (HEADERS, TIMEOUT, anotar_redirecciones, liberar_conexion, memorizar_resultado,
+                         resultado_por_status)
+
+PROFUNDIDAD_MAX = int(os.getenv("CRAWLER_PROFUNDIDAD_MAX", "2"))
+MAX_PAGINAS = int(os.getenv("CRAWLER_MAX_PAGINAS", "50"))  # presupuesto de páginas por rastreo
+MAX_WORKERS = int(os.getenv("CRAWLER_MAX_WORKERS", "8"))
+# Se parsean como mucho estos bytes de cada página (una más grande se lee truncada)
+MAX_BYTES_PAGINA = int(os.getenv("CRAWLER_MAX_BYTES_PAGINA", str(5 * 1024 * 1024)))
+
+
+def parsear_enlaces(html, url_base, encoding=None):
+    """Extrae los href de las etiquetas <a> como URLs absolutas (sin duplicados)"""
+    return extraer_urls(html, url_base, encoding=encoding)
+
+
+def parsear_pagina(html, url_base, activos=False, encoding=None):
+    """
+    Retorna (enlaces, recursos): los href de <a> y, con activos, las imágenes,
+    scripts y hojas de estilo como [(etiqueta, URL absoluta)]. Una sola pasada del parser.
+    encoding es el charset de la respuesta HTTP, si lo declara.
+    """
+    if not activos:
+        return parsear_enlaces(html, url_base, encoding), []
+    enlaces = {}
+    recursos = {}
+    atributos = iterar_atributos(html, {**ETIQUETAS_ENLACE, **ETIQUETAS_ACTIVOS}, rel_link=REL_ACTIVOS,
+                                 encoding=encoding)
+    for tag, valor in atributos:
+        url = url_absoluta(url_base, valor)
+        if url is None:
+            continue  # href inválido: se omite sin perder el resto de la página
+        if tag in ETIQUETAS_ENLACE:
+            enlaces.setdefault(url, None)
+        else:
+            recursos.setdefault(url, tag)
+    return list(enlaces), [(tag, url) for url, tag in recursos.items()]
+
+
+def leer_pagina(response, max_bytes=MAX_BYTES_PAGINA):
+    """
+    Cuerpo de una respuesta pedida con stream=True, hasta max_bytes.
+    Si se leyó entero la conexión vuelve al pool; si se cortó, se descarta.
+    """
+    partes = []
+    total = 0
+    try:
+        for bloque in response.iter_content(64 * 1024):
+            partes.append(bloque)
+            total += len(bloque)
+            if total >= max_bytes:
+                break
+    finally:
+        response.close()
+    return b''.join(partes)[:max_bytes]
+
+
+def extraer_pagina(url, tiempos=None, activos=False):
+    """Descarga una URL y retorna (enlaces, recursos) como parsear_pagina (tiempos: TiemposEscaneo opcional)"""
+    try:
+        with fase(tiempos, 'descarga'):
+            response = obtener_sesion(HEADERS).get(url, timeout=TIMEOUT, stream=True)
+            if response.status_code >= 400:
+                liberar_conexion(response)
+                response.raise_for_status()
+            html = leer_pagina(response)
+        with fase(tiempos, 'parseo'):
+            return parsear_pagina(html, url, activos, charset_de(response.headers.get('Content-Type')))
+    except Exception as e:
+        return [], []
+
+
+def extraer_enlaces(url, tiempos=None):
+    """Extrae todos los enlaces de una URL (tiempos: TiemposEscaneo opcional)"""
+    return extraer_pagina(url, tiempos)[0]
+
+
+def _descargar_pagina(url, tiempos=None, activos=False, destino=None):
+    """
+    Descarga una página (pide destino, un href original; el resultado queda
+    con url, la canónica, como clave). Retorna (resultado, enlaces, recursos)
+    o (resultado de error, [], []).
+    """
+    destino = destino or url
+    try:
+        sesion = obtener_sesion(HEADERS)
+        with fase(tiempos, 'descarga'):
+            response = obtener_planificador().ejecutar(
+                destino, lambda: sesion.get(destino, timeout=TIMEOUT, stream=True))
+            # Status y Content-Type antes del cuerpo: un PDF o un video no se descarga para saber que no es HTML
+            es_html = 'html' in response.headers.get('Content-Type', '')
+            if response.status_code >= 400 or not es_html:
+                liberar_conexion(response)
+                html = None
+            else:
+                html = leer_pagina(response)
+    except Exception as e:
+        resultado = resultado_por_status(url, None, e)
+        memorizar_resultado(resultado)
+        return resultado, [], []
+
+    resultado = anotar_redirecciones(resultado_por_status(url, response.status_code), response)
+    memorizar_resultado(resultado)
+    if html is None:
+        return resultado, [], []
+    with fase(tiempos, 'parseo'):
+        encoding = charset_de(response.headers.get('Content-Type'))
+        return (resultado, *parsear_pagina(html, response.url, activos, encoding))
+
+
+def rastrear_sitio(url_inicial, profundidad_max=None, max_paginas=None, max_workers=None, tiempos=None,
+                   activos=False):
+    """
+    Rastrea el sitio nivel por nivel siguiendo solo enlaces del mismo origen
+    (el de la URL final de la semilla, si redirige).
+
+    Retorna un dict con:
+      - paginas: URLs canónicas descargadas, en orden de visita
+      - resultados: resultado de verificación de cada página descargada
+      - indice: IndiceEnlaces con cada destino canónico y sus ocurrencias
+    Con tiempos (TiemposEscaneo) acumula las fases descarga, parseo y dedup.
+    Con activos también indexa imágenes, scripts y hojas de estilo (con su
+    etiqueta en la ocurrencia), sin seguirlos.
+    """
+    profundidad_max = PROFUNDIDAD_MAX if profundidad_max is None else profundidad_max
+    max_paginas = max_paginas or MAX_PAGINAS
+    inicial = canonizar_url(url_inicial)
+    origen = urlparse(inicial).netloc
+
+    visitados = {inicial}
+    frontera = [(inicial, url_de_peticion(url_inicial))]  # (canónica, URL que se pide)
+    paginas = []
+    resultados = {}
+    indice = IndiceEnlaces()
+
+    with ThreadPoolExecutor(max_workers=max_workers or MAX_WORKERS) as executor:
+        for profundidad in range(profundidad_max + 1):
+            if not frontera:
+                break
+            lote = frontera[:max_paginas - len(paginas)]
+            siguiente = []
+
+            # executor.map conserva el orden del lote: el rastreo es determinista
+            descargar = partial(_descargar_pagina, tiempos=tiempos, activos=activos)
+            descargas = executor.map(lambda par: descargar(par[0], destino=par[1]), lote)
+            for (pagina, _), (resultado, encontrados, recursos) in zip(lote, descargas):
+                print(f"🕷️ [{profundidad}] {pagina} -> {resultado['status']} ({len(encontrados)} enlaces)")
+                paginas.append(pagina)
+                resultados[pagina] = resultado
+                if profundidad == 0 and resultado.get('url_final'):
+                    # La semilla redirigió (apex -> www, http -> https, localhost -> 127.0.0.1):
+                    # el sitio a rastrear es el de la URL final, contra la que se resuelven sus enlaces
+                    final = canonizar_url(resultado['url_final'])
+                    origen = urlparse(final).netloc
+                    visitados.add(final)
+
+                with fase(tiempos, 'dedup'):
+                    for enlace in encontrados:
+                        if not es_verificable(enlace):
+                            continue
+                        canonica = indice.agregar(enlace, pagina)
+                        if canonica in visitados or urlparse(canonica).netloc != origen:
+                            continue
+                        visitados.add(canonica)
+                        siguiente.append((canonica, url_de_peticion(enlace)))
+                    for etiqueta, recurso in recursos:
+                        if es_verificable(recurso):
+                            indice.agregar(recurso, pagina, etiqueta)
+
+            if len(paginas) >= max_paginas:
+                break
+            frontera = siguiente
+
+    return {'paginas': paginas, 'resultados': resultados, 'indice': indice}
@@ -0,0 +1,107 @@
+"""
+Pipeline de escaneo
+Recolecta los enlaces de una URL (página única, rastreo del sitio o sus
+sitemaps) y, en modo activos, sus imágenes, scripts y hojas de estilo;
+entrega los resultados de verificación a medida que se obtienen.
+Lo usan /analizar, el endpoint de streaming y los trabajos en segundo plano.
+"""
+
+from itertools import chain
+
+from activos import anotar_activo, es_activo
+from crawler import extraer_pagina, rastrear_sitio
+from metricas import fase
+from normalizacion import IndiceEnlaces, es_verificable, urls_de_peticion
+from salud_hosts import SaludHosts
+from sitemap import urls_del_sitio
+from verificador import MAX_ENLACES, iterar_verificaciones
+
+
+def recolectar_enlaces(url, data, tiempos=None):
+    """
+    Obtiene los enlaces a verificar según el modo pedido.
+    Retorna (URLs canónicas, resultados ya conocidos, {canónica: ocurrencias}),
+    donde cada ocurrencia es {'href': enlace original, 'pagina': página que lo contiene}
+    y, con data['activos'], 'etiqueta' (img, script...) si el destino es un recurso.
+    Con tiempos (TiemposEscaneo) registra las fases de descarga, parseo y dedup.
+    """
+    modo = data.get('modo')
+    if modo == 'sitemap':
+        # Las páginas del sitemap se verifican directamente, sin descargarlas ni parsear su HTML
+        indice = IndiceEnlaces()
+        # Se verifican como mucho MAX_ENLACES: no tiene sentido leer más URLs de los sitemaps
+        max_urls = min(data.get('max_urls') or MAX_ENLACES, MAX_ENLACES)
+        with fase(tiempos, 'sitemap'):
+            listadas = urls_del_sitio(url, data.get('sitemap'), max_urls)
+        with fase(tiempos, 'dedup'):
+            for enlace, sitemap in listadas:
+                if es_verificable(enlace):
+                    indice.agregar(enlace, sitemap)
+        conocidos = {}
+    elif modo != 'rastreo':
+        indice = IndiceEnlaces()
+        enlaces, recursos = extraer_pagina(url, tiempos, activos=bool(data.get('activos')))
+        with fase(tiempos, 'dedup'):
+            for enlace in enlaces:
+                if es_verificable(enlace):
+                    indice.agregar(enlace, url)
+            for etiqueta, recurso in recursos:
+                if es_verificable(recurso):
+                    indice.agregar(recurso, url, etiqueta)
+        conocidos = {}
+    else:
+        rastreo = rastrear_sitio(
+            url,
+            profundidad_max=data.get('profundidad'),
+            max_paginas=data.get('max_paginas'),
+            tiempos=tiempos,
+            activos=bool(data.get('activos'))
+        )
+        indice = rastreo['indice']
+        # Las páginas descargadas durante el rastreo ya tienen su status: no se verifican de nuevo
+        conocidos = rastreo['resultados']
+
+    referencias = {c: indice.ocurrencias(c) for c in indice.canonicas()}
+    return indice.canonicas(), conocidos, referencias
+
+
+def iterar_resultados(enlaces, conocidos, referencias, tiempos=None):
+    """
+    Entrega el resultado de cada enlace apenas está disponible: primero los ya
+    conocidos por el rastreo y luego los verificados, en orden de llegada.
+    Cada URL canónica se verifica una sola vez; el resultado lleva todas
+    las ocurrencias (href original y página) que apuntan a ella.
+    Con tiempos registra la fase de verificación y el desglose por enlace.
+    Los activos (ocurrencias con etiqueta) se verifican midiendo su tipo y
+    tamaño y salen anotados por anotar_activo(). Enlaces y activos comparten
+    la tabla de hosts caídos del escaneo. Se pide el primer href original de
+    cada destino, no su URL canónica.
+    """
+    pendientes = [e for e in enlaces if e not in conocidos]
+    recursos = [e for e in pendientes if es_activo(referencias.get(e, []))]
+    if recursos:
+        separados = set(recursos)
+        pendientes = [e for e in pendientes if e not in separados]
+    ya_conocidos = (conocidos[e] for e in enlaces if e in conocidos)
+    total = len(enlaces)
+    salud = SaludHosts()
+    destinos = urls_de_peticion(referencias)
+
+    with fase(tiempos, 'verificacion'):
+        verificados = chain(
+            ya_conocidos,
+            iterar_verificaciones(pendientes, tiempos=tiempos, salud=salud, destinos=destinos),
+            iterar_verificaciones(recursos, tiempos=tiempos, medir_peso=True, salud=salud, destinos=destinos)
+        )
+        for i, resultado in enumerate(verificados, 1):
+            print(f"Verificado {i}/{total}: {resultado['url']} -> {resultado['status']}")
+            if referencias:
+                ocurrencias = referencias.get(resultado['url'], [])
+                if not resultado.get('activo') and es_activo(ocurrencias):
+                    resultado = anotar_activo(resultado, ocurrencias)
+                resultado = dict(
+                    resultado,
+                    encontrado_en=list(dict.fromkeys(o['pagina'] for o in ocurrencias)),
+                    ocurrencias=ocurrencias
+                )
+            yield resultado
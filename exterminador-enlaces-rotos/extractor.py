@@ -0,0 +1,186 @@
+"""
+Extractor de enlaces por eventos
+Lee los atributos de enlace (a[href], img[src|srcset], source[src|srcset],
+link[href], script[src]) sin construir el árbol DOM. Usa el parser de lxml con un target de eventos
+si está instalado y el HTMLParser de la librería estándar si no.
+"""
+
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+import codecs
+import re
+
+try:
+    from lxml import etree
+except ImportError:  # lxml es opcional
+    etree = None
+
+# etiqueta -> atributo (o tupla de atributos) con la URL
+ETIQUETAS_ENLACE = {'a': 'href'}
+# Activos que pesan en la carga de la página (modo activos); <link> solo con estos rel
+ETIQUETAS_ACTIVOS = {'img': ('src', 'srcset'), 'source': ('src', 'srcset'), 'script': 'src', 'link': 'href'}
+REL_ACTIVOS = ('stylesheet',)
+
+# <meta charset="..."> o <meta http-equiv="Content-Type" content="...; charset=...">
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+_BOMS = ((codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+
+
+def charset_de(content_type):
+    """Charset de un Content-Type ('text/html; charset=ISO-8859-1'), o None si no lo declara"""
+    for parametro in (content_type or '').split(';')[1:]:
+        nombre, _, valor = parametro.partition('=')
+        if nombre.strip().lower() == 'charset':
+            return valor.strip().strip('"\'') or None
+    return None
+
+
+def decodificar_html(html, encoding=None):
+    """
+    Texto del documento. Como los navegadores: manda el BOM, después el
+    charset de la respuesta HTTP (encoding), después un <meta charset> en
+    los primeros 1024 bytes y si no hay nada, UTF-8.
+    """
+    if not isinstance(html, bytes):
+        return html
+    for bom, codificacion in _BOMS:
+        if html.startswith(bom):
+            encoding = codificacion
+            break
+    else:
+        if not encoding:
+            meta = _META_CHARSET.search(html[:1024])
+            encoding = meta.group(1).decode('ascii') if meta else 'utf-8'
+    try:
+        if codecs.lookup(encoding).name == 'iso8859-1':
+            encoding = 'cp1252'  # lo que los navegadores usan para "latin1"
+    except LookupError:
+        encoding = 'utf-8'  # charset desconocido
+    return html.decode(encoding, errors='replace')
+
+
+def candidatos_srcset(srcset):
+    """
+    URLs de un srcset ("a.jpg 1x, b.jpg 2x"). Sigue la regla del estándar:
+    la URL es el tramo sin espacios (así los data: con comas no se parten).
+    """
+    urls = []
+    i, n = 0, len(srcset)
+    while i < n:
+        while i < n and (srcset[i].isspace() or srcset[i] == ','):
+            i += 1
+        inicio = i
+        while i < n and not srcset[i].isspace():
+            i += 1
+        url = srcset[inicio:i]
+        if url.endswith(','):
+            url = url.rstrip(',')  # candidato sin descriptor
+        else:
+            while i < n and srcset[i] != ',':
+                i += 1  # descriptores (1x, 480w)
+        if url:
+            urls.append(url)
+    return urls
+
+
+def _urls_de(tag, attrs, atributos, rel_link):
+    """URLs que aporta una etiqueta ya filtrada por nombre; attrs es un mapeo"""
+    if tag == 'link' and rel_link is not None:
+        rels = (attrs.get('rel') or '').lower().split()
+        if not any(rel in rels for rel in rel_link):
+            return []
+    if isinstance(atributos, str):
+        valor = attrs.get(atributos)
+        return [valor] if valor else []
+    urls = []
+    for atributo in atributos:
+        valor = attrs.get(atributo)
+        if valor:
+            urls.extend(candidatos_srcset(valor) if atributo == 'srcset' else [valor])
+    return urls
+
+
+class _ColectorLxml:
+    """Target de lxml: solo reacciona a las etiquetas de apertura"""
+
+    def __init__(self, etiquetas, rel_link=None):
+        self.etiquetas = etiquetas
+        self.rel_link = rel_link
+        self.valores = []
+
+    def start(self, tag, attrib):
+        atributos = self.etiquetas.get(tag)
+        if atributos:
+            for valor in _urls_de(tag, attrib, atributos, self.rel_link):
+                self.valores.append((tag, valor))
+
+    def end(self, tag):
+        pass
+
+    def data(self, data):
+        pass
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return self.valores
+
+
+class _ColectorHTMLParser(HTMLParser):
+    """Fallback con la librería estándar"""
+
+    def __init__(self, etiquetas, rel_link=None):
+        super().__init__(convert_charrefs=True)
+        self.etiquetas = etiquetas
+        self.rel_link = rel_link
+        self.valores = []
+
+    def handle_starttag(self, tag, attrs):
+        atributos = self.etiquetas.get(tag)
+        if atributos:
+            # dict() se queda con el primer valor de cada atributo, como los navegadores
+            primeros = dict(reversed(attrs))
+            for valor in _urls_de(tag, primeros, atributos, self.rel_link):
+                self.valores.append((tag, valor))
+
+    handle_startendtag = handle_starttag
+
+
+def iterar_atributos(html, etiquetas=None, usar_lxml=True, rel_link=None, encoding=None):
+    """
+    Retorna [(etiqueta, valor)] con los atributos de URL en orden de aparición.
+    html puede ser str o bytes (encoding: charset de la respuesta HTTP, ver
+    decodificar_html). Con rel_link, los <link> cuentan solo si su rel
+    incluye alguno de esos valores.
+    """
+    etiquetas = etiquetas or ETIQUETAS_ENLACE
+    # Se decodifica antes: lxml con bytes y sin <meta charset> ignora el charset del header
+    html = decodificar_html(html, encoding)
+
+    if usar_lxml and etree is not None:
+        parser = etree.HTMLParser(target=_ColectorLxml(etiquetas, rel_link))
+        try:
+            parser.feed(html)
+            return [(tag, valor.strip()) for tag, valor in parser.close()]
+        except etree.LxmlError:
+            pass  # HTML que lxml no acepta: seguimos con la librería estándar
+
+    colector = _ColectorHTMLParser(etiquetas, rel_link)
+    colector.feed(html)
+    colector.close()
+    return [(tag, valor.strip()) for tag, valor in colector.valores]
+
+
+def url_absoluta(url_base, valor):
+    """urljoin() de un atributo; None si el valor no es una URL válida (http://[::1)"""
+    try:
+        return urljoin(url_base, valor)
+    except ValueError:
+        return None
+
+
+def extraer_urls(html, url_base, etiquetas=None, usar_lxml=True, rel_link=None, encoding=None):
+    """Extrae las URLs absolutas sin duplicados, conservando el orden; omite los valores inválidos"""
+    urls = (url_absoluta(url_base, valor) for _, valor in iterar_atributos(html, etiquetas, usar_lxml, rel_link, encoding))
+    return [url for url in dict.fromkeys(urls) if url is not None]
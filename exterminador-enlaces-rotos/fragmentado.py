@@ -0,0 +1,98 @@
+"""
+Escaneo fragmentado en varios procesos
+Reparte las URLs canónicas por host entre un pool de procesos; cada
+fragmento corre su propio bucle de verificación concurrente y los
+resultados vuelven al proceso principal por una cola a medida que llegan.
+Un host nunca se reparte entre dos procesos, así los límites por host
+del planificador siguen valiendo.
+"""
+
+import multiprocessing
+import os
+import queue
+from urllib.parse import urlsplit
+
+from sesion_http import cerrar_sesion
+from verificador import iterar_verificaciones, memorizar_resultado
+
+PROCESOS = int(os.getenv("FRAGMENTADO_PROCESOS", str(os.cpu_count() or 1)))
+
+_FIN = None  # marca de fin de fragmento en la cola
+
+
+def repartir_por_host(enlaces, procesos):
+    """
+    Agrupa los enlaces por host y asigna cada grupo al fragmento menos cargado
+    (los hosts con más enlaces primero). Retorna solo los fragmentos no vacíos.
+    """
+    por_host = {}
+    for enlace in enlaces:
+        por_host.setdefault(urlsplit(enlace).netloc, []).append(enlace)
+
+    fragmentos = [[] for _ in range(max(1, procesos))]
+    for grupo in sorted(por_host.values(), key=len, reverse=True):
+        min(fragmentos, key=len).extend(grupo)
+    return [f for f in fragmentos if f]
+
+
+def _verificar_fragmento(enlaces, max_workers, cola, medir_peso=False, destinos=None):
+    """
+    Corre en el proceso hijo: verifica su fragmento y publica cada resultado.
+    Cada host vive en un solo fragmento, así que la tabla de hosts caídos del hijo basta.
+    """
+    try:
+        for resultado in iterar_verificaciones(enlaces, max_workers, medir_peso=medir_peso, destinos=destinos):
+            cola.put(resultado)
+    finally:
+        cerrar_sesion()  # el proceso del pool sigue vivo: no dejar sus conexiones abiertas
+        cola.put(_FIN)
+
+
+def iterar_fragmentado(enlaces, procesos=None, max_workers=None, detener=None, medir_peso=False, salud=None,
+                       destinos=None):
+    """
+    Verifica los enlaces en varios procesos y entrega cada resultado apenas llega.
+    Con un solo fragmento se verifica en este mismo proceso (con la tabla de
+    hosts caídos salud, si se indica).
+    medir_peso agrega tipo y tamaño de cada recurso (modo activos).
+    detener (threading.Event opcional) corta el escaneo y termina los procesos.
+    destinos ({enlace: URL a pedir}) como en iterar_verificaciones.
+    """
+    fragmentos = repartir_por_host(enlaces, procesos or PROCESOS)
+    if len(fragmentos) <= 1:
+        yield from iterar_verificaciones(enlaces, max_workers, medir_peso=medir_peso, salud=salud, detener=detener,
+                                         destinos=destinos)
+        return
+
+    # spawn: los hijos no heredan sockets abiertos ni locks de la sesión compartida
+    contexto = multiprocessing.get_context('spawn')
+    print(f"🧩 {len(enlaces)} enlaces en {len(fragmentos)} procesos "
+          f"({', '.join(str(len(f)) for f in fragmentos)})")
+
+    with contexto.Manager() as manager, contexto.Pool(len(fragmentos)) as pool:
+        cola = manager.Queue()
+        destinos = destinos or {}
+        tareas = [pool.apply_async(_verificar_fragmento,
+                                   (f, max_workers, cola, medir_peso, {e: destinos[e] for e in f if e in destinos}))
+                  for f in fragmentos]
+        activos = len(tareas)
+        while activos:
+            if detener is not None and detener.is_set():
+                return  # al salir del with, el pool termina los procesos
+            try:
+                resultado = cola.get(timeout=1)
+            except queue.Empty:
+                for tarea in tareas:
+                    if tarea.ready() and not tarea.successful():
+                        tarea.get()  # relanza el error del proceso hijo
+                continue
+            if resultado is _FIN:
+                activos -= 1
+                continue
+            # El proceso principal también aprende el resultado para próximos escaneos
+            if not resultado.get('host_caido'):
+                memorizar_resultado(resultado)
+            yield resultado
+
+        for tarea in tareas:
+            tarea.get()  # relanza errores de fragmentos que terminaron antes de tiempo
@@ -0,0 +1,246 @@
+"""
+Instrumentación del escaneo
+Tiempos por fase de cada escaneo (descarga, parseo, deduplicación,
+verificación) y, por enlace, el desglose espera en el planificador /
+DNS / conexión / TLS / primera respuesta (TTFB) que registran el
+planificador y la capa de transporte.
+Los mismos datos se acumulan en histogramas del proceso que /metrics
+expone en formato de texto de Prometheus.
+"""
+
+from contextlib import contextmanager, nullcontext
+import threading
+import time
+
+CUBETAS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+MAS_LENTOS = 10  # enlaces con su desglose en la respuesta
+
+
+class Histograma:
+    """Histograma de Prometheus con una etiqueta; thread-safe"""
+
+    def __init__(self, nombre, ayuda, etiqueta, cubetas=CUBETAS):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiqueta = etiqueta
+        self.cubetas = cubetas
+        self._series = {}  # valor de etiqueta -> [conteos por cubeta, suma, total]
+        self._lock = threading.Lock()
+
+    def observar(self, valor_etiqueta, segundos):
+        with self._lock:
+            serie = self._series.setdefault(valor_etiqueta, [[0] * len(self.cubetas), 0.0, 0])
+            for i, limite in enumerate(self.cubetas):
+                if segundos <= limite:
+                    serie[0][i] += 1
+            serie[1] += segundos
+            serie[2] += 1
+
+    def exponer(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        with self._lock:
+            for valor, (conteos, suma, total) in sorted(self._series.items()):
+                etiqueta = f'{self.etiqueta}="{valor}"'
+                for limite, conteo in zip(self.cubetas, conteos):
+                    lineas.append(f'{self.nombre}_bucket{{{etiqueta},le="{limite}"}} {conteo}')
+                lineas.append(f'{self.nombre}_bucket{{{etiqueta},le="+Inf"}} {total}')
+                lineas.append(f'{self.nombre}_sum{{{etiqueta}}} {suma:.6f}')
+                lineas.append(f'{self.nombre}_count{{{etiqueta}}} {total}')
+        return lineas
+
+
+class Contador:
+    """Contador de Prometheus con una etiqueta; thread-safe"""
+
+    def __init__(self, nombre, ayuda, etiqueta):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiqueta = etiqueta
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, valor_etiqueta, cantidad=1):
+        with self._lock:
+            self._valores[valor_etiqueta] = self._valores.get(valor_etiqueta, 0) + cantidad
+
+    def exponer(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        with self._lock:
+            for valor, total in sorted(self._valores.items()):
+                lineas.append(f'{self.nombre}{{{self.etiqueta}="{valor}"}} {total}')
+        return lineas
+
+
+DURACION_FASES = Histograma('exterminador_fase_segundos',
+                            'Duración de cada fase de un escaneo', 'fase')
+DURACION_ETAPAS = Histograma('exterminador_peticion_etapa_segundos',
+                             'Espera, DNS, conexión, TLS y TTFB acumulados por enlace verificado', 'etapa')
+ENLACES_VERIFICADOS = Contador('exterminador_enlaces_verificados_total',
+                               'Enlaces verificados por estado', 'estado')
+PETICIONES_HTTP = Contador('exterminador_peticiones_http_total',
+                           'Respuestas HTTP recibidas por clase de status', 'clase')
+
+_METRICAS = (DURACION_FASES, DURACION_ETAPAS, ENLACES_VERIFICADOS, PETICIONES_HTTP)
+
+
+def exposicion_prometheus():
+    """Todas las métricas del proceso en formato de texto de Prometheus"""
+    lineas = []
+    for metrica in _METRICAS:
+        lineas.extend(metrica.exponer())
+    return '\n'.join(lineas) + '\n'
+
+
+class MedicionEnlace:
+    """Desglose de tiempos de un enlace (sumado sobre HEAD, GET y redirecciones)"""
+
+    def __init__(self, url):
+        self.url = url
+        self.espera = 0.0  # turnos del planificador (límites por host, Retry-After)
+        self.dns = 0.0
+        self.conexion = 0.0
+        self.tls = 0.0
+        self.respuesta = 0.0  # desde el envío hasta los headers, incluye la conexión nueva
+        self.peticiones = 0
+        self.total = 0.0
+
+    @property
+    def ttfb(self):
+        return max(0.0, self.respuesta - self.dns - self.conexion - self.tls)
+
+    def a_dict(self):
+        return {
+            'url': self.url,
+            'peticiones': self.peticiones,
+            'espera_ms': _ms(self.espera),
+            'dns_ms': _ms(self.dns),
+            'conexion_ms': _ms(self.conexion),
+            'tls_ms': _ms(self.tls),
+            'ttfb_ms': _ms(self.ttfb),
+            'total_ms': _ms(self.total)
+        }
+
+
+_local = threading.local()  # medición del enlace que verifica este hilo
+
+
+def registrar_etapa(etapa, segundos):
+    """Lo llaman el planificador y la capa de transporte: suma espera/dns/conexion/tls al enlace en curso del hilo"""
+    medicion = getattr(_local, 'medicion', None)
+    if medicion is not None:
+        setattr(medicion, etapa, getattr(medicion, etapa) + segundos)
+
+
+def registrar_respuesta(response, *args, **kwargs):
+    """Hook de respuesta de requests (se llama también por cada redirección)"""
+    PETICIONES_HTTP.incrementar(f"{response.status_code // 100}xx")
+    medicion = getattr(_local, 'medicion', None)
+    if medicion is not None:
+        medicion.peticiones += 1
+        medicion.respuesta += response.elapsed.total_seconds()
+
+
+@contextmanager
+def medir_enlace(url, tiempos=None):
+    """Mide la verificación de un enlace en este hilo; la agrega a tiempos si se indica"""
+    medicion = MedicionEnlace(url)
+    _local.medicion = medicion
+    inicio = time.perf_counter()
+    try:
+        yield medicion
+    finally:
+        medicion.total = time.perf_counter() - inicio
+        _local.medicion = None
+        if medicion.peticiones:
+            DURACION_ETAPAS.observar('espera', medicion.espera)
+            DURACION_ETAPAS.observar('dns', medicion.dns)
+            DURACION_ETAPAS.observar('conexion', medicion.conexion)
+            DURACION_ETAPAS.observar('tls', medicion.tls)
+            DURACION_ETAPAS.observar('ttfb', medicion.ttfb)
+        if tiempos is not None:
+            tiempos.agregar_enlace(medicion)
+
+
+def contar_resultado(resultado):
+    ENLACES_VERIFICADOS.incrementar(resultado['estado'])
+
+
+def fase(tiempos, nombre):
+    """tiempos.fase(nombre), o un contexto vacío si el escaneo no se mide"""
+    return tiempos.fase(nombre) if tiempos is not None else nullcontext()
+
+
+def _ms(segundos):
+    return round(segundos * 1000, 2)
+
+
+def _resumen_ms(valores):
+    valores = sorted(valores)
+    if not valores:
+        return None
+    return {
+        'p50': _ms(valores[int(0.50 * (len(valores) - 1))]),
+        'p95': _ms(valores[int(0.95 * (len(valores) - 1))]),
+        'max': _ms(valores[-1]),
+        'suma': _ms(sum(valores))
+    }
+
+
+class TiemposEscaneo:
+    """
+    Tiempos de un escaneo. Las fases que corren en varios hilos (descarga y
+    parseo del rastreo) suman el tiempo de todos ellos.
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.total = None
+        self._fases = {}
+        self._enlaces = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def fase(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.agregar(nombre, time.perf_counter() - inicio)
+
+    def agregar(self, nombre, segundos):
+        with self._lock:
+            self._fases[nombre] = self._fases.get(nombre, 0.0) + segundos
+        DURACION_FASES.observar(nombre, segundos)
+
+    def agregar_enlace(self, medicion):
+        with self._lock:
+            self._enlaces.append(medicion)
+
+    def cerrar(self):
+        """Fija el tiempo total del escaneo"""
+        if self.total is None:
+            self.total = time.perf_counter() - self.inicio
+            DURACION_FASES.observar('total', self.total)
+        return self
+
+    def a_dict(self):
+        with self._lock:
+            fases = dict(self._fases)
+            enlaces = list(self._enlaces)
+        total = self.total if self.total is not None else time.perf_counter() - self.inicio
+        con_red = [m for m in enlaces if m.peticiones]
+        return {
+            'total_ms': _ms(total),
+            'fases_ms': {nombre: _ms(segundos) for nombre, segundos in fases.items()},
+            'enlaces': {
+                'medidos': len(enlaces),
+                'sin_red': len(enlaces) - len(con_red),  # resueltos desde la caché
+                'espera_ms': _resumen_ms([m.espera for m in con_red]),
+                'dns_ms': _resumen_ms([m.dns for m in con_red]),
+                'conexion_ms': _resumen_ms([m.conexion for m in con_red]),
+                'tls_ms': _resumen_ms([m.tls for m in con_red]),
+                'ttfb_ms': _resumen_ms([m.ttfb for m in con_red]),
+                'total_ms': _resumen_ms([m.total for m in con_red])
+            },
+            'mas_lentos': [m.a_dict() for m in sorted(con_red, key=lambda m: m.total, reverse=True)[:MAS_LENTOS]]
+        }
@@ -0,0 +1,118 @@
+"""
+Normalización de URLs e índice de deduplicación
+Reduce las variantes de un mismo destino (fragmentos, barra final, puerto
+por defecto, mayúsculas en el host, orden de la query) a una URL canónica,
+de modo que cada destino se verifica una sola vez aunque se enlace de
+muchas formas y desde muchas páginas.
+La URL canónica es solo la clave del índice y de la caché: lo que se pide
+al servidor es uno de los href originales (url_de_peticion).
+"""
+
+from urllib.parse import urldefrag, urlsplit, urlunsplit, parse_qsl, urlencode, quote
+import re
+import string
+
+PUERTOS_POR_DEFECTO = {'http': '80', 'https': '443'}
+ESQUEMAS_VERIFICABLES = ('http', 'https')
+
+_ESCAPE = re.compile(r'%([0-9A-Fa-f]{2})')
+_NO_RESERVADOS = frozenset(string.ascii_letters + string.digits + '-._~')
+
+
+def _decodificar_no_reservados(texto):
+    """%7E -> ~ y %41 -> A; los escapes reservados (%2F, %3F, %23...) quedan, en mayúsculas"""
+    def reemplazar(escape):
+        caracter = chr(int(escape.group(1), 16))
+        return caracter if caracter in _NO_RESERVADOS else '%' + escape.group(1).upper()
+    return _ESCAPE.sub(reemplazar, texto)
+
+
+def _normalizar_ruta(ruta):
+    """Unifica %7E / ~ y similares sin decodificar escapes que cambian la ruta (%2F no es /)"""
+    ruta = quote(_decodificar_no_reservados(ruta), safe="/:@!$&'()*+,;=-._~%")
+    if not ruta:
+        return '/'
+    if len(ruta) > 1 and ruta.endswith('/'):
+        ruta = ruta.rstrip('/') or '/'
+    return ruta
+
+
+def canonizar_url(url):
+    """
+    URL canónica para deduplicar verificaciones.
+    Las URLs que no son http(s) (mailto:, tel:, javascript:) se devuelven sin cambios.
+    """
+    partes = urlsplit(url.strip())
+    esquema = partes.scheme.lower()
+    if esquema not in ESQUEMAS_VERIFICABLES:
+        return url.strip()
+
+    host = (partes.hostname or '').rstrip('.')
+    if ':' in host:
+        host = f"[{host}]"  # IPv6
+    try:
+        puerto = partes.port
+    except ValueError:  # puerto inválido: se verifica tal cual
+        return url.strip()
+    netloc = host
+    if partes.username:
+        credenciales = partes.username + (f":{partes.password}" if partes.password else '')
+        netloc = f"{credenciales}@{host}"
+    if puerto and str(puerto) != PUERTOS_POR_DEFECTO[esquema]:
+        netloc += f":{puerto}"
+
+    query = urlencode(sorted(parse_qsl(partes.query, keep_blank_values=True)))
+    return urlunsplit((esquema, netloc, _normalizar_ruta(partes.path), query, ''))
+
+
+def es_verificable(url):
+    return urlsplit(url).scheme.lower() in ESQUEMAS_VERIFICABLES
+
+
+def url_de_peticion(href):
+    """URL que se pide para un href: la original, sin el #fragmento (no viaja al servidor)"""
+    return urldefrag(href.strip())[0]
+
+
+def urls_de_peticion(referencias):
+    """{canónica: URL a pedir} con el primer href de cada destino ({canónica: ocurrencias})"""
+    return {canonica: url_de_peticion(ocurrencias[0]['href'])
+            for canonica, ocurrencias in referencias.items() if ocurrencias}
+
+
+class IndiceEnlaces:
+    """
+    Índice canónico -> ocurrencias.
+    Conserva cada href original y la página donde apareció para el reporte,
+    mientras la verificación se hace una sola vez por URL canónica.
+    """
+
+    def __init__(self):
+        self._ocurrencias = {}  # canónica -> [{'href': ..., 'pagina': ...}]
+
+    def agregar(self, href, pagina=None, etiqueta=None):
+        """Registra un enlace encontrado (etiqueta: 'img', 'script'... en modo activos); retorna su URL canónica"""
+        canonica = canonizar_url(href)
+        ocurrencias = self._ocurrencias.setdefault(canonica, [])
+        ocurrencia = {'href': href, 'pagina': pagina}
+        if etiqueta:
+            ocurrencia['etiqueta'] = etiqueta
+        if ocurrencia not in ocurrencias:
+            ocurrencias.append(ocurrencia)
+        return canonica
+
+    def canonicas(self):
+        """URLs únicas a verificar, en orden de primera aparición"""
+        return list(self._ocurrencias)
+
+    def ocurrencias(self, canonica):
+        return list(self._ocurrencias.get(canonica, []))
+
+    def total_ocurrencias(self):
+        return sum(len(o) for o in self._ocurrencias.values())
+
+    def __len__(self):
+        return len(self._ocurrencias)
+
+    def __contains__(self, canonica):
+        return canonica in self._ocurrencias
@@ -0,0 +1,140 @@
+"""
+Planificador de cortesía por host
+Limita la concurrencia por host, respeta Retry-After y aplica backoff
+adaptativo ante 429/503 para que subir la concurrencia global no termine
+en bloqueos ni en falsos "ROTO". Por defecto no espacia las peticiones:
+un host solo se frena después de pedirlo con un 429/503
+(PLANIFICADOR_PETICIONES_POR_SEGUNDO fija una tasa desde el inicio).
+"""
+
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import os
+import threading
+import time
+
+from metricas import registrar_etapa
+
+# Igual al pool de conexiones por host de sesion_http (HTTP_MAX_CONEXIONES_POR_HOST)
+MAX_CONCURRENCIA_POR_HOST = int(os.getenv("PLANIFICADOR_CONCURRENCIA_POR_HOST", "8"))
+PETICIONES_POR_SEGUNDO = float(os.getenv("PLANIFICADOR_PETICIONES_POR_SEGUNDO", "0"))  # por host; 0: sin límite
+MAX_REINTENTOS = int(os.getenv("PLANIFICADOR_MAX_REINTENTOS", "3"))
+BACKOFF_FACTOR = float(os.getenv("PLANIFICADOR_BACKOFF_FACTOR", "2"))
+MAX_ESPERA = float(os.getenv("PLANIFICADOR_MAX_ESPERA", "30"))  # tope de Retry-After/backoff
+INTERVALO_MIN_PENALIZADO = 0.1  # intervalo de un host sin tasa fija después de un 429/503
+
+STATUS_REINTENTABLES = (429, 503)
+
+
+def segundos_retry_after(valor):
+    """Interpreta Retry-After (segundos o fecha HTTP); None si no es válido"""
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class EstadoHost:
+    """Semáforo, intervalo entre peticiones y penalización de un host"""
+
+    def __init__(self, concurrencia, intervalo):
+        self.semaforo = threading.BoundedSemaphore(concurrencia)
+        self.intervalo_base = intervalo
+        self.intervalo = intervalo
+        self.proximo_turno = 0.0
+        self.lock = threading.Lock()
+
+
+class PlanificadorHosts:
+    """Reparte turnos por host antes de cada petición"""
+
+    def __init__(self, concurrencia=MAX_CONCURRENCIA_POR_HOST, peticiones_por_segundo=PETICIONES_POR_SEGUNDO):
+        self.concurrencia = concurrencia
+        self.intervalo = 1.0 / peticiones_por_segundo if peticiones_por_segundo > 0 else 0.0
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _estado(self, host):
+        with self._lock:
+            estado = self._hosts.get(host)
+            if estado is None:
+                estado = self._hosts[host] = EstadoHost(self.concurrencia, self.intervalo)
+            return estado
+
+    @contextmanager
+    def turno(self, url):
+        """Bloquea hasta que el host admita otra petición (concurrencia y tasa)"""
+        estado = self._estado(urlparse(url).netloc.lower())
+        pedido = time.perf_counter()
+        with estado.semaforo:
+            with estado.lock:
+                ahora = time.monotonic()
+                inicio = max(ahora, estado.proximo_turno)
+                estado.proximo_turno = inicio + estado.intervalo
+            if inicio > ahora:
+                time.sleep(inicio - ahora)
+            registrar_etapa('espera', time.perf_counter() - pedido)
+            yield estado
+
+    def penalizar(self, url, espera):
+        """Pausa el host durante 'espera' segundos y duplica su intervalo"""
+        estado = self._estado(urlparse(url).netloc.lower())
+        with estado.lock:
+            estado.intervalo = min(max(estado.intervalo * 2, INTERVALO_MIN_PENALIZADO), MAX_ESPERA)
+            estado.proximo_turno = max(estado.proximo_turno, time.monotonic() + espera)
+
+    def recuperar(self, url):
+        """Una respuesta normal reduce poco a poco la penalización del host"""
+        estado = self._estado(urlparse(url).netloc.lower())
+        with estado.lock:
+            if estado.intervalo > estado.intervalo_base:
+                reducido = estado.intervalo / 2
+                # Debajo del mínimo de penalización vuelve a la tasa base (sin límite por defecto)
+                if reducido < INTERVALO_MIN_PENALIZADO:
+                    reducido = estado.intervalo_base
+                estado.intervalo = max(estado.intervalo_base, reducido)
+
+    def ejecutar(self, url, peticion):
+        """
+        Ejecuta peticion() respetando los límites del host.
+        Reintenta ante 429/503 esperando Retry-After o un backoff exponencial;
+        si se agotan los reintentos retorna la última respuesta.
+        """
+        for intento in range(MAX_REINTENTOS + 1):
+            with self.turno(url):
+                response = peticion()
+
+            if response.status_code not in STATUS_REINTENTABLES:
+                self.recuperar(url)
+                return response
+
+            espera = segundos_retry_after(response.headers.get('Retry-After'))
+            if espera is None:
+                espera = BACKOFF_FACTOR ** intento
+            espera = min(espera, MAX_ESPERA)
+            if intento < MAX_REINTENTOS:
+                print(f"⏳ {response.status_code} en {url}: reintento en {espera:.1f}s")
+            self.penalizar(url, espera)
+
+        return response
+
+
+_planificador = None
+_lock_global = threading.Lock()
+
+
+def obtener_planificador():
+    """Retorna el planificador compartido del proceso (lo crea la primera vez)"""
+    global _planificador
+    if _planificador is None:
+        with _lock_global:
+            if _planificador is None:
+                _planificador = PlanificadorHosts()
+    return _planificador
@@ -0,0 +1,139 @@
+"""
+Salud de hosts por escaneo
+Recuerda los hosts que fallaron al resolver o al conectar para que el resto
+de sus enlaces se reporte como ERROR con el motivo conocido, sin pagar un
+timeout por cada uno. Opcionalmente un segundo intento confirma la caída
+antes de descartar el host.
+"""
+
+from urllib.parse import urlsplit
+import os
+import socket
+import threading
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+REPROBAR = os.getenv("SALUD_HOSTS_REPROBAR", "0") == "1"  # confirmar con un segundo intento
+# Espera máxima por el segundo intento de otro hilo; después la petición se hace igual
+ESPERA_SONDEO = float(os.getenv("SALUD_HOSTS_ESPERA_SONDEO", "30"))
+
+VIVO = 'vivo'
+SOSPECHOSO = 'sospechoso'  # falló una vez; espera la confirmación
+CAIDO = 'caido'
+
+
+class HostCaido(Exception):
+    """El host del enlace ya falló en este escaneo"""
+
+    def __init__(self, host, motivo):
+        super().__init__(f"{host}: {motivo}")
+        self.host = host
+        self.motivo = motivo
+
+
+def _cadena_de_causas(error):
+    """El error, el motivo que envuelve requests/urllib3 y sus causas encadenadas"""
+    vistos = []
+    pendientes = [error]
+    while pendientes:
+        actual = pendientes.pop()
+        if actual is None or any(actual is v for v in vistos):
+            continue
+        vistos.append(actual)
+        pendientes.extend([actual.__cause__, actual.__context__, getattr(actual, 'reason', None)])
+        if actual.args and isinstance(actual.args[0], BaseException):
+            pendientes.append(actual.args[0])
+    return vistos
+
+
+def motivo_de_fallo(error):
+    """Motivo si el error es del host (DNS o conexión); None si el host respondió"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return 'Timeout de conexión'
+    if not isinstance(error, requests.exceptions.ConnectionError) or isinstance(error, requests.exceptions.SSLError):
+        return None
+    causas = _cadena_de_causas(error)
+    if any(isinstance(c, socket.gaierror) for c in causas):
+        return 'DNS: el host no resuelve'
+    if any(isinstance(c, ConnectionRefusedError) for c in causas):
+        return 'Conexión rechazada'
+    if any(isinstance(c, NewConnectionError) for c in causas):
+        return 'Sin conexión con el host'
+    return None
+
+
+def host_de(url):
+    return urlsplit(url).netloc.lower()
+
+
+class SaludHosts:
+    """Tabla de salud de los hosts de un escaneo; thread-safe"""
+
+    def __init__(self, reprobar=REPROBAR, espera_sondeo=ESPERA_SONDEO):
+        self.reprobar = reprobar
+        self.espera_sondeo = espera_sondeo
+        self._hosts = {}  # host -> {'estado', 'motivo', 'sondeo', 'evento'}
+        self._lock = threading.Lock()
+
+    def comprobar(self, url):
+        """
+        Se llama justo antes de cada petición. Lanza HostCaido si el host ya
+        falló; si hay que confirmarlo, el primer hilo hace el segundo intento
+        y el resto espera su resultado (hasta espera_sondeo segundos).
+        """
+        host = host_de(url)
+        while True:
+            with self._lock:
+                info = self._hosts.get(host)
+                if info is None or info['estado'] == VIVO:
+                    return
+                if info['estado'] == CAIDO:
+                    raise HostCaido(host, info['motivo'])
+                if info['sondeo'] in (None, threading.get_ident()):
+                    info['sondeo'] = threading.get_ident()
+                    return
+                evento = info['evento']
+            if not evento.wait(self.espera_sondeo):
+                return  # el segundo intento no se resolvió a tiempo: no bloquear más este enlace
+
+    def soltar(self, url):
+        """
+        El hilo que hacía el segundo intento terminó sin resolver el host
+        (se detuvo o falló otro host tras una redirección): otro hilo lo retoma.
+        """
+        host = host_de(url)
+        with self._lock:
+            info = self._hosts.get(host)
+            if info is not None and info['estado'] == SOSPECHOSO and info['sondeo'] == threading.get_ident():
+                info['sondeo'] = None
+                evento, info['evento'] = info['evento'], threading.Event()
+                evento.set()
+
+    def registrar_exito(self, url):
+        host = host_de(url)
+        with self._lock:
+            info = self._hosts.get(host)
+            if info is not None and info['estado'] != VIVO:
+                info['evento'].set()
+                del self._hosts[host]
+
+    def registrar_error(self, url, error):
+        """Anota el error de una petición; retorna el motivo si cuenta como fallo del host"""
+        motivo = motivo_de_fallo(error)
+        if motivo is None:
+            self.registrar_exito(url)  # el host contestó aunque la petición fallara
+            return None
+        host = host_de(url)
+        with self._lock:
+            info = self._hosts.get(host)
+            if info is None and self.reprobar:
+                self._hosts[host] = {'estado': SOSPECHOSO, 'motivo': motivo, 'sondeo': None,
+                                     'evento': threading.Event()}
+            elif info is None or info['estado'] == SOSPECHOSO:
+                if info is not None:
+                    info['evento'].set()
+                self._hosts[host] = {'estado': CAIDO, 'motivo': motivo, 'sondeo': None,
+                                     'evento': threading.Event()}
+                print(f"🪦 Host caído ({motivo}): {host}; sus enlaces restantes se reportan sin conectar")
+        return motivo
@@ -0,0 +1,174 @@
+"""
+Capa de transporte HTTP compartida
+Una única sesión de requests con pools keep-alive por host, reutilizada
+entre peticiones y entre escaneos del mismo proceso.
+Las conexiones nuevas miden DNS, conexión TCP y handshake TLS para metricas.py
+y resuelven los hosts a través de una caché DNS con TTL (también negativa).
+"""
+
+import os
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+from metricas import registrar_etapa, registrar_respuesta
+
+POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "32"))  # hosts con pool abierto a la vez
+MAX_CONEXIONES_POR_HOST = int(os.getenv("HTTP_MAX_CONEXIONES_POR_HOST", "8"))
+DNS_TTL = float(os.getenv("HTTP_DNS_TTL", "300"))
+DNS_TTL_NEGATIVO = float(os.getenv("HTTP_DNS_TTL_NEGATIVO", "30"))  # hosts que no resuelven
+
+_sesion = None
+_lock = threading.Lock()
+
+
+class CacheDNS:
+    """
+    Resultados de getaddrinfo por (host, puerto) durante DNS_TTL segundos.
+    Un host que no resuelve se recuerda DNS_TTL_NEGATIVO segundos: sus
+    enlaces fallan sin volver a consultar al resolver.
+    """
+
+    def __init__(self, ttl=DNS_TTL, ttl_negativo=DNS_TTL_NEGATIVO):
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self._entradas = {}  # (host, puerto) -> (expira, direcciones o gaierror)
+        self._lock = threading.Lock()
+
+    def resolver(self, host, puerto):
+        """Como socket.getaddrinfo(host, puerto, 0, SOCK_STREAM); lanza socket.gaierror"""
+        clave = (host, puerto)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+        if entrada is not None and entrada[0] > time.monotonic():
+            if isinstance(entrada[1], socket.gaierror):
+                raise entrada[1]
+            return entrada[1]
+
+        try:
+            direcciones = socket.getaddrinfo(host, puerto, 0, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            self._guardar(clave, e, self.ttl_negativo)
+            raise
+        self._guardar(clave, direcciones, self.ttl)
+        return direcciones
+
+    def _guardar(self, clave, valor, ttl):
+        if ttl > 0:
+            with self._lock:
+                self._entradas[clave] = (time.monotonic() + ttl, valor)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+cache_dns = CacheDNS()
+
+
+class _ConexionMedida:
+    """
+    Resuelve el host por separado (con la caché DNS) para medir DNS y después
+    conecta a cada dirección resuelta (como create_connection), midiendo la
+    conexión TCP.
+    """
+
+    def _new_conn(self):
+        inicio = time.perf_counter()
+        try:
+            direcciones = cache_dns.resolver(self._dns_host, self.port)
+        except socket.gaierror as e:
+            registrar_etapa('dns', time.perf_counter() - inicio)
+            raise NewConnectionError(self, f"Failed to resolve '{self._dns_host}' ({e})") from e
+        resuelto = time.perf_counter()
+        registrar_etapa('dns', resuelto - inicio)
+
+        host_original = self._dns_host
+        try:
+            for i, direccion in enumerate(direcciones):
+                self._dns_host = direccion[4][0]
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (NewConnectionError, ConnectTimeoutError):
+                    if i == len(direcciones) - 1:
+                        raise
+        finally:
+            self._dns_host = host_original
+            self._segundos_socket = time.perf_counter() - inicio
+            registrar_etapa('conexion', time.perf_counter() - resuelto)
+        return sock
+
+
+class ConexionHTTPMedida(_ConexionMedida, HTTPConnection):
+    pass
+
+
+class ConexionHTTPSMedida(_ConexionMedida, HTTPSConnection):
+    def connect(self):
+        inicio = time.perf_counter()
+        self._segundos_socket = 0.0
+        super().connect()
+        # connect() = socket (ya medido en _new_conn) + handshake TLS
+        registrar_etapa('tls', max(0.0, time.perf_counter() - inicio - self._segundos_socket))
+
+
+class _PoolHTTPMedido(HTTPConnectionPool):
+    ConnectionCls = ConexionHTTPMedida
+
+
+class _PoolHTTPSMedido(HTTPSConnectionPool):
+    ConnectionCls = ConexionHTTPSMedida
+
+
+class AdaptadorMedido(HTTPAdapter):
+    """HTTPAdapter cuyos pools crean conexiones instrumentadas"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _PoolHTTPMedido, 'https': _PoolHTTPSMedido}
+
+
+def crear_sesion(headers=None):
+    """
+    Crea una sesión con pools por host.
+    pool_block=True hace que los hilos esperen una conexión libre en lugar de
+    abrir conexiones extra, así el límite por host se respeta.
+    """
+    sesion = requests.Session()
+    adaptador = AdaptadorMedido(
+        pool_connections=POOL_HOSTS,
+        pool_maxsize=MAX_CONEXIONES_POR_HOST,
+        pool_block=True
+    )
+    sesion.mount('http://', adaptador)
+    sesion.mount('https://', adaptador)
+    if headers:
+        sesion.headers.update(headers)
+    sesion.hooks['response'].append(registrar_respuesta)
+    return sesion
+
+
+def obtener_sesion(headers=None):
+    """Retorna la sesión compartida del proceso (la crea la primera vez)"""
+    global _sesion
+    if _sesion is None:
+        with _lock:
+            if _sesion is None:
+                _sesion = crear_sesion(headers)
+    return _sesion
+
+
+def cerrar_sesion():
+    """Cierra la sesión compartida y libera las conexiones abiertas"""
+    global _sesion
+    with _lock:
+        if _sesion is not None:
+            _sesion.close()
+            _sesion = None
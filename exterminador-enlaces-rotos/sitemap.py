@@ -0,0 +1,138 @@
+"""
+Ingesta de sitemap.xml y robots.txt
+Lee sitemaps (incluidos índices de sitemaps y .xml.gz) con un parser XML
+incremental mientras se descargan, descarta lo que robots.txt prohíbe y
+entrega las URLs directamente al pipeline de verificación.
+"""
+
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+import os
+import xml.etree.ElementTree as ET
+import zlib
+
+from sesion_http import obtener_sesion
+from verificador import HEADERS
+
+MAX_URLS = int(os.getenv("SITEMAP_MAX_URLS", "50000"))
+MAX_SITEMAPS = int(os.getenv("SITEMAP_MAX_SITEMAPS", "200"))  # sitemaps hijos de un índice
+TIMEOUT = float(os.getenv("SITEMAP_TIMEOUT", "30"))
+TAMANO_BLOQUE = 64 * 1024
+
+
+def _nombre_local(tag):
+    """'{http://www.sitemaps.org/schemas/sitemap/0.9}loc' -> 'loc'"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def leer_robots(url_sitio):
+    """
+    Descarga y parsea robots.txt del sitio.
+    Si no existe o falla, retorna un parser que permite todo.
+    """
+    partes = urlsplit(url_sitio)
+    url_robots = f"{partes.scheme}://{partes.netloc}/robots.txt"
+    robots = RobotFileParser(url_robots)
+    try:
+        response = obtener_sesion(HEADERS).get(url_robots, timeout=TIMEOUT)
+        if response.status_code == 200:
+            robots.parse(response.text.splitlines())
+        else:
+            robots.parse([])
+    except Exception as e:
+        print(f"⚠️ No se pudo leer {url_robots}: {e}")
+        robots.parse([])
+    return robots
+
+
+def sitemaps_del_sitio(url_sitio, robots=None):
+    """Sitemaps declarados en robots.txt o, si no hay, /sitemap.xml"""
+    robots = robots or leer_robots(url_sitio)
+    declarados = robots.site_maps() or []
+    return declarados or [urljoin(url_sitio, '/sitemap.xml')]
+
+
+def _iterar_elementos(url):
+    """
+    Descarga el sitemap en streaming y entrega (tipo_raiz, loc) a medida que
+    el parser cierra cada <loc>. Descomprime gzip al vuelo.
+    """
+    response = obtener_sesion(HEADERS).get(url, timeout=TIMEOUT, stream=True)
+    try:
+        response.raise_for_status()
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        descompresor = None
+        raiz = None
+        pila = []  # nombres de los elementos abiertos
+        primero = True
+
+        for bloque in response.iter_content(TAMANO_BLOQUE):
+            if primero:
+                primero = False
+                # requests ya quita el Content-Encoding; un .gz servido como archivo llega comprimido
+                if bloque[:2] == b'\x1f\x8b':
+                    descompresor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            if descompresor is not None:
+                bloque = descompresor.decompress(bloque)
+            parser.feed(bloque)
+
+            for evento, elemento in parser.read_events():
+                nombre = _nombre_local(elemento.tag)
+                if evento == 'start':
+                    if raiz is None:
+                        raiz = elemento
+                    pila.append(nombre)
+                    continue
+                pila.pop()
+                # Solo <url><loc> y <sitemap><loc>; image:loc y similares se ignoran
+                if nombre == 'loc' and pila and pila[-1] in ('url', 'sitemap') and elemento.text:
+                    yield _nombre_local(raiz.tag), elemento.text.strip()
+                elif nombre in ('url', 'sitemap') and len(pila) == 1:
+                    raiz.clear()  # liberar memoria: el árbol nunca crece
+        parser.close()
+    finally:
+        response.close()
+
+
+def iterar_urls_sitemap(url_sitemap, robots=None, max_urls=None):
+    """
+    Entrega (url, sitemap_que_la_lista) por cada página del sitemap (recorre
+    índices de sitemaps) que robots.txt permite visitar, hasta max_urls.
+    """
+    max_urls = max_urls or MAX_URLS
+    pendientes = [url_sitemap]
+    vistos = set()
+    entregadas = 0
+
+    while pendientes and len(vistos) < MAX_SITEMAPS:
+        actual = pendientes.pop(0)
+        if actual in vistos:
+            continue
+        vistos.add(actual)
+        print(f"🗺️ Leyendo sitemap: {actual}")
+        try:
+            for raiz, loc in _iterar_elementos(actual):
+                if raiz == 'sitemapindex':
+                    pendientes.append(loc)
+                    continue
+                if robots is not None and not robots.can_fetch(HEADERS['User-Agent'], loc):
+                    continue
+                yield loc, actual
+                entregadas += 1
+                if entregadas >= max_urls:
+                    return
+        except Exception as e:
+            print(f"⚠️ Sitemap ilegible {actual}: {e}")
+
+
+def urls_del_sitio(url_sitio, url_sitemap=None, max_urls=None):
+    """URLs de todos los sitemaps del sitio, respetando robots.txt; retorna [(url, sitemap)]"""
+    robots = leer_robots(url_sitio)
+    sitemaps = [url_sitemap] if url_sitemap else sitemaps_del_sitio(url_sitio, robots)
+    max_urls = max_urls or MAX_URLS
+    urls = []
+    for sitemap in sitemaps:
+        urls.extend(iterar_urls_sitemap(sitemap, robots, max_urls - len(urls)))
+        if len(urls) >= max_urls:
+            break
+    return urls
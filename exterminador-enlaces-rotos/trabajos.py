@@ -0,0 +1,207 @@
+"""
+Trabajos de escaneo en segundo plano
+Cada escaneo encolado recibe un id, lo ejecuta un pool de workers y
+su progreso y resultados parciales se consultan por polling.
+Los trabajos terminados se conservan hasta que expiran.
+Mientras corren guardan un checkpoint en disco para poder reanudarse
+tras un reinicio del worker.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+import uuid
+
+from activos import PesoPorPagina
+from checkpoints import Checkpoint, ruta_trabajo
+from escaneo import recolectar_enlaces, iterar_resultados
+from metricas import TiemposEscaneo
+from verificador import MAX_ENLACES, ContadorEstadisticas
+
+MAX_WORKERS = int(os.getenv("TRABAJOS_MAX_WORKERS", "2"))  # escaneos simultáneos
+RETENCION = float(os.getenv("TRABAJOS_RETENCION_SEGUNDOS", "3600"))  # vida de un trabajo terminado
+
+EN_COLA = 'en_cola'
+EN_PROGRESO = 'en_progreso'
+COMPLETADO = 'completado'
+FALLIDO = 'error'
+
+
+class Trabajo:
+    """Estado de un escaneo: progreso, resultados parciales y resumen"""
+
+    def __init__(self, url, data, trabajo_id=None, reanudar=False):
+        self.id = trabajo_id or uuid.uuid4().hex
+        self.reanudar = reanudar
+        self.url = url
+        self.data = data
+        self.estado = EN_COLA
+        self.creado = time.time()
+        self.terminado = None
+        self.total = 0
+        self.total_encontrados = 0
+        self.paginas_rastreadas = 0
+        self.resultados = []
+        self.contador = ContadorEstadisticas()
+        self.pesos = PesoPorPagina()
+        self.tiempos = TiemposEscaneo()
+        self.error = None
+        self.lock = threading.Lock()
+
+    def a_dict(self, desde=0):
+        """Vista JSON del trabajo; desde permite pedir solo los resultados nuevos"""
+        with self.lock:
+            vista = {
+                'id': self.id,
+                'url_analizada': self.url,
+                'estado': self.estado,
+                'progreso': {
+                    'verificados': len(self.resultados),
+                    'total': self.total
+                },
+                'total_enlaces': self.total_encontrados,
+                'paginas_rastreadas': self.paginas_rastreadas,
+                'estadisticas': self.contador.resumen(),
+                'resultados': self.resultados[desde:],
+                'desde': desde,
+                'reanudado': self.reanudar,
+                'timings': self.tiempos.a_dict(),
+                'error': self.error
+            }
+            if self.data.get('activos'):
+                vista['peso_por_pagina'] = self.pesos.resumen()
+            return vista
+
+
+class GestorTrabajos:
+    """Cola de escaneos atendida por un pool de hilos"""
+
+    def __init__(self, max_workers=MAX_WORKERS, retencion=RETENCION):
+        self.retencion = retencion
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='escaneo')
+        self._trabajos = {}
+        self._lock = threading.Lock()
+
+    def encolar(self, url, data):
+        """Registra el escaneo y lo envía al pool; retorna el Trabajo"""
+        self.purgar()
+        trabajo = Trabajo(url, data)
+        with self._lock:
+            self._trabajos[trabajo.id] = trabajo
+        self._executor.submit(self._ejecutar, trabajo)
+        return trabajo
+
+    def reanudar(self, trabajo_id):
+        """
+        Retoma un escaneo desde su checkpoint conservando el mismo id.
+        Lanza FileNotFoundError si no hay checkpoint y RuntimeError si sigue en curso.
+        """
+        self.purgar()
+        checkpoint = Checkpoint.cargar(ruta_trabajo(trabajo_id))
+        with self._lock:
+            actual = self._trabajos.get(trabajo_id)
+            if actual is not None and actual.terminado is None:
+                raise RuntimeError('El escaneo sigue en curso')
+            trabajo = Trabajo(checkpoint.datos['url'], checkpoint.datos['opciones'], trabajo_id, reanudar=True)
+            self._trabajos[trabajo.id] = trabajo
+        self._executor.submit(self._ejecutar, trabajo)
+        return trabajo
+
+    def obtener(self, trabajo_id):
+        self.purgar()
+        with self._lock:
+            return self._trabajos.get(trabajo_id)
+
+    def purgar(self):
+        """Elimina los trabajos terminados cuya retención expiró, con su checkpoint si quedó uno"""
+        limite = time.time() - self.retencion
+        with self._lock:
+            expirados = [t.id for t in self._trabajos.values() if t.terminado is not None and t.terminado < limite]
+            for trabajo_id in expirados:
+                del self._trabajos[trabajo_id]
+        for trabajo_id in expirados:
+            try:
+                os.remove(ruta_trabajo(trabajo_id))  # el de un trabajo fallido ya no se reanuda
+            except FileNotFoundError:
+                pass
+
+    def _ejecutar(self, trabajo):
+        with trabajo.lock:
+            trabajo.estado = EN_PROGRESO
+            trabajo.tiempos = TiemposEscaneo()  # sin contar la espera en la cola
+        checkpoint = None
+        try:
+            checkpoint = self._preparar(trabajo)
+            with trabajo.lock:
+                trabajo.total = len(checkpoint.enlaces)
+                trabajo.total_encontrados = checkpoint.datos['total_encontrados']
+                trabajo.paginas_rastreadas = checkpoint.datos['paginas_rastreadas']
+
+            conocidos = checkpoint.completados()
+            for resultado in iterar_resultados(checkpoint.enlaces, conocidos, checkpoint.referencias,
+                                               trabajo.tiempos):
+                with trabajo.lock:
+                    trabajo.resultados.append(resultado)
+                    trabajo.contador.agregar(resultado)
+                    trabajo.pesos.agregar(resultado)
+                if resultado['url'] not in conocidos:
+                    checkpoint.marcar(resultado)
+
+            checkpoint.eliminar()
+            estado_final, error = COMPLETADO, None
+        except Exception as e:
+            print(f"❌ Trabajo {trabajo.id}: {str(e)}")
+            estado_final, error = FALLIDO, str(e)
+            if checkpoint is not None:
+                # Lo verificado desde el último guardado no se pierde para resume_job_id
+                try:
+                    checkpoint.guardar()
+                except Exception as e:
+                    print(f"❌ Trabajo {trabajo.id}: no se pudo guardar el checkpoint: {e}")
+
+        trabajo.tiempos.cerrar()
+        with trabajo.lock:
+            trabajo.estado = estado_final
+            trabajo.error = error
+            trabajo.terminado = time.time()
+
+    def _preparar(self, trabajo):
+        """Carga el checkpoint al reanudar; si no, recolecta los enlaces y crea uno nuevo"""
+        ruta = ruta_trabajo(trabajo.id)
+        if trabajo.reanudar:
+            checkpoint = Checkpoint.cargar(ruta)
+            print(f"♻️ Trabajo {trabajo.id}: reanudando, {len(checkpoint.pendientes())} enlaces pendientes")
+            return checkpoint
+
+        print(f"📊 Trabajo {trabajo.id}: analizando {trabajo.url}")
+        enlaces, conocidos, referencias = recolectar_enlaces(trabajo.url, trabajo.data, trabajo.tiempos)
+        if not enlaces:
+            raise ValueError('No se pudieron extraer enlaces de esta URL')
+
+        enlaces_limitados = enlaces[:MAX_ENLACES]
+        checkpoint = Checkpoint.nuevo(
+            ruta, trabajo.url, trabajo.data, enlaces_limitados,
+            {e: referencias[e] for e in enlaces_limitados if e in referencias},
+            total_encontrados=len(enlaces),
+            paginas_rastreadas=len(conocidos)
+        )
+        for enlace in enlaces_limitados:
+            if enlace in conocidos:
+                checkpoint.marcar(conocidos[enlace])
+        checkpoint.guardar()
+        return checkpoint
+
+
+_gestor = None
+_lock_global = threading.Lock()
+
+
+def obtener_gestor():
+    """Retorna el gestor de trabajos del proceso (lo crea la primera vez)"""
+    global _gestor
+    if _gestor is None:
+        with _lock_global:
+            if _gestor is None:
+                _gestor = GestorTrabajos()
+    return _gestor
@@ -0,0 +1,383 @@
+"""
+Motor de verificación de enlaces
+Verifica listas de enlaces en paralelo con concurrencia acotada.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import os
+
+import requests
+
+from cache_enlaces import obtener_cache, obtener_cache_redirecciones
+from metricas import contar_resultado, medir_enlace
+from normalizacion import canonizar_url
+from planificador import obtener_planificador
+from salud_hosts import HostCaido, SaludHosts, host_de
+from sesion_http import obtener_sesion
+
+# User-Agent para evitar bloqueos
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+TIMEOUT = float(os.getenv("VERIFICADOR_TIMEOUT", "10"))
+# Enlaces verificados a la vez; el planificador limita además la carga por host
+MAX_WORKERS = int(os.getenv("VERIFICADOR_MAX_WORKERS", "32"))
+MAX_ENLACES = int(os.getenv("VERIFICADOR_MAX_ENLACES", "500"))  # presupuesto de enlaces por análisis
+# Saltos de redirección tolerados; una cadena más larga se marca (cada salto es un round-trip más)
+MAX_SALTOS_REDIRECCION = int(os.getenv("VERIFICADOR_MAX_SALTOS_REDIRECCION", "2"))
+# Tope al medir descargando un activo cuyo servidor no informa el tamaño
+MAX_BYTES_MEDIDOS = int(os.getenv("VERIFICADOR_MAX_BYTES_MEDIDOS", str(20 * 1024 * 1024)))
+# Cuerpo máximo que se lee tras un GET de verificación para reutilizar la conexión
+MAX_BYTES_DRENADOS = int(os.getenv("VERIFICADOR_MAX_BYTES_DRENADOS", str(64 * 1024)))
+
+ESTADOS_ROTOS = ('ROTO', 'TIMEOUT', 'ERROR')
+
+# Respuestas a HEAD que muchos servidores dan aunque el recurso exista: se confirman con GET
+STATUS_HEAD_NO_FIABLE = (400, 403, 404, 405, 406, 500, 501)
+
+# Cada cuánto se mira el evento detener mientras no llegan resultados
+ESPERA_DETENER = 0.2
+
+
+class EscaneoDetenido(Exception):
+    """Se pidió detener el escaneo antes de hacer la petición"""
+
+
+def resultado_por_status(url, status_code, error=None):
+    """Traduce un status HTTP (o la excepción de la petición) al resultado de un enlace"""
+    if error is not None:
+        if isinstance(error, requests.exceptions.Timeout):
+            return {'url': url, 'status': 'TIMEOUT', 'estado': 'TIMEOUT'}
+        return {'url': url, 'status': 'ERROR', 'estado': 'ERROR'}
+    if status_code >= 400:
+        return {'url': url, 'status': status_code, 'estado': 'ROTO'}
+    return {'url': url, 'status': status_code, 'estado': 'OK'}
+
+
+def _con_cadena(resultado, cadena, url_final):
+    """Agrega al resultado la cadena de redirecciones (si la hubo)"""
+    if cadena:
+        resultado.update(
+            redirecciones=len(cadena),
+            url_final=url_final,
+            cadena=cadena,
+            cadena_larga=len(cadena) > MAX_SALTOS_REDIRECCION
+        )
+    return resultado
+
+
+def anotar_redirecciones(resultado, response):
+    """Registra en el resultado los saltos que siguió requests hasta la respuesta final"""
+    cadena = [{'url': r.url, 'status': r.status_code} for r in response.history]
+    return _con_cadena(resultado, cadena, response.url)
+
+
+def memorizar_resultado(resultado, validadores=None):
+    """
+    Guarda el resultado en la caché. Si llegó por redirecciones, registra la
+    cadena y el estado de la URL final, para que otros enlaces que pasen por
+    cualquiera de sus saltos se resuelvan sin recorrerla.
+    """
+    cache = obtener_cache()
+    cache.guardar(resultado, validadores)
+    if resultado.get('cadena'):
+        obtener_cache_redirecciones().registrar(resultado['cadena'], resultado['url_final'])
+        cache.guardar(_datos_finales(resultado, {'url': canonizar_url(resultado['url_final'])}))
+
+
+def _datos_finales(origen, destino):
+    """Copia a destino el estado y, si se midió, el peso del recurso final"""
+    for clave in ('status', 'estado', 'tipo_contenido', 'tamano_bytes'):
+        if clave in origen:
+            destino[clave] = origen[clave]
+    return destino
+
+
+def _resolver_por_cadena(url, cache):
+    """Resultado de un enlace que es un salto de una cadena conocida con URL final vigente en caché"""
+    conocida = obtener_cache_redirecciones().obtener(url)
+    if conocida is None:
+        return None
+    cadena, url_final = conocida
+    final = cache.obtener(canonizar_url(url_final))
+    if final is None:
+        return None
+    return _con_cadena(_datos_finales(final, {'url': url}), cadena, url_final)
+
+
+def _sirve(resultado, medir_peso):
+    """Un resultado guardado sirve si existe y, cuando se pide el peso, lo trae"""
+    if resultado is None:
+        return False
+    return not medir_peso or resultado['estado'] != 'OK' or 'tamano_bytes' in resultado
+
+
+def verificar_enlace(url, usar_cache=True, medir_peso=False, salud=None, detener=None, destino=None):
+    """
+    Verifica si un enlace está roto (reutiliza resultados vigentes de la caché
+    y cadenas de redirección ya recorridas).
+    url es la clave del resultado (la canónica en un escaneo); destino, la URL
+    que se pide al servidor (un href original), por defecto url.
+    Con medir_peso agrega tipo_contenido y tamano_bytes (modo activos).
+    Con salud (SaludHosts del escaneo) un enlace de un host ya caído se
+    reporta como ERROR con el motivo conocido, sin conectar.
+    Con detener (threading.Event) lanza EscaneoDetenido en vez de hacer
+    más peticiones una vez que se activa.
+    """
+    cache = obtener_cache()
+    if usar_cache:
+        resultado = cache.obtener(url)
+        if resultado is None:
+            resultado = _resolver_por_cadena(url, cache)
+            if _sirve(resultado, medir_peso):
+                cache.guardar(resultado)
+        if _sirve(resultado, medir_peso):
+            return resultado
+
+    anterior, validadores = cache.obtener_vencido(url)
+    if not _sirve(anterior, medir_peso):
+        anterior = None  # un 304 no traería el peso que falta
+    resultado, validadores_nuevos = consultar_enlace(url, validadores if anterior else None, medir_peso, salud,
+                                                    detener, destino)
+    if resultado['status'] == 304 and anterior is not None:
+        # No cambió desde la última verificación: vale el resultado anterior
+        resultado = anterior
+        validadores_nuevos = validadores_nuevos or validadores
+    if not resultado.get('host_caido'):
+        memorizar_resultado(resultado, validadores_nuevos)  # lo deducido de otro enlace no se guarda
+    return resultado
+
+
+def _headers_condicionales(validadores):
+    headers = {}
+    if validadores and validadores.get('etag'):
+        headers['If-None-Match'] = validadores['etag']
+    if validadores and validadores.get('last_modified'):
+        headers['If-Modified-Since'] = validadores['last_modified']
+    return headers
+
+
+def _validadores_de(response):
+    validadores = {}
+    if response.headers.get('ETag'):
+        validadores['etag'] = response.headers['ETag']
+    if response.headers.get('Last-Modified'):
+        validadores['last_modified'] = response.headers['Last-Modified']
+    return validadores
+
+
+def liberar_conexion(response):
+    """
+    Devuelve la conexión al pool si el cuerpo es corto (el byte del Range, una
+    página de error pequeña): leerlo cuesta menos que un handshake nuevo.
+    Con un cuerpo sin límite conocido la conexión se descarta sin leerlo.
+    """
+    largo = response.headers.get('Content-Length', '')
+    if response.status_code == 206 or (largo.isdigit() and int(largo) <= MAX_BYTES_DRENADOS):
+        response.content  # lee el cuerpo y libera la conexión para reutilizarla
+    else:
+        response.close()
+
+
+def _get_sin_cuerpo(sesion, url, headers):
+    """
+    GET en streaming que no descarga el cuerpo completo.
+    Pide un solo byte con Range; si el servidor no acepta el rango (416)
+    repite sin Range.
+    """
+    response = sesion.get(url, headers=dict(headers, Range='bytes=0-0'), timeout=TIMEOUT,
+                          allow_redirects=True, stream=True)
+    liberar_conexion(response)
+    if response.status_code == 416:
+        response = sesion.get(url, headers=headers, timeout=TIMEOUT, allow_redirects=True, stream=True)
+        liberar_conexion(response)
+    return response
+
+
+def _peso_de(response):
+    """(tipo de contenido, bytes a transferir) según los headers; bytes es None si no se informan"""
+    tipo = response.headers.get('Content-Type', '').split(';')[0].strip().lower() or None
+    total = response.headers.get('Content-Range', '').rpartition('/')[2]  # bytes 0-0/12345
+    if total.isdigit():
+        return tipo, int(total)
+    largo = response.headers.get('Content-Length', '')
+    if response.status_code != 206 and largo.isdigit():
+        return tipo, int(largo)
+    return tipo, None
+
+
+def _medir_descarga(sesion, url):
+    """Bytes del cuerpo tal como viajan (sin descomprimir), hasta MAX_BYTES_MEDIDOS"""
+    response = sesion.get(url, timeout=TIMEOUT, allow_redirects=True, stream=True)
+    try:
+        total = 0
+        for bloque in response.raw.stream(64 * 1024, decode_content=False):
+            total += len(bloque)
+            if total >= MAX_BYTES_MEDIDOS:
+                break
+        return total
+    finally:
+        response.close()
+
+
+def consultar_enlace(url, validadores=None, medir_peso=False, salud=None, detener=None, destino=None):
+    """
+    Hace la petición HTTP para un enlace, sin pasar por la caché.
+    Pide destino (por defecto url); el resultado queda con url como clave.
+    Primero HEAD; si el servidor lo rechaza o lo maneja mal, un GET sin cuerpo.
+    Con validadores envía If-None-Match / If-Modified-Since.
+    Con medir_peso toma tipo y tamaño de los headers; si el servidor no informa
+    el tamaño, descarga el cuerpo para contarlo.
+    Con salud consulta y actualiza la tabla de hosts caídos del escaneo.
+    Con detener activado no hace más peticiones (EscaneoDetenido).
+    Retorna (resultado, validadores de la respuesta).
+    """
+    sesion = obtener_sesion(HEADERS)
+    planificador = obtener_planificador()
+    headers = _headers_condicionales(validadores)
+    destino = destino or url
+
+    def seguir():
+        if detener is not None and detener.is_set():
+            raise EscaneoDetenido(url)
+
+    def pedir(peticion):
+        # La salud del host se mira ya con el turno: mientras se esperaba pudo caerse
+        def con_salud():
+            seguir()
+            if salud is not None:
+                salud.comprobar(destino)
+            return peticion()
+        return planificador.ejecutar(destino, con_salud)
+
+    try:
+        response = pedir(lambda: sesion.head(destino, headers=headers, timeout=TIMEOUT, allow_redirects=True))
+        if response.status_code in STATUS_HEAD_NO_FIABLE:
+            response = pedir(lambda: _get_sin_cuerpo(sesion, destino, headers))
+        if salud is not None:
+            salud.registrar_exito(destino)
+        status = response.status_code
+        if status == 206:
+            status = 200  # el recurso existe; 206 solo refleja el Range pedido
+        resultado = anotar_redirecciones(resultado_por_status(url, status), response)
+        if medir_peso and resultado['estado'] == 'OK':
+            tipo, tamano = _peso_de(response)
+            if tamano is None and status != 304:
+                with planificador.turno(destino):
+                    seguir()
+                    tamano = _medir_descarga(sesion, destino)
+            resultado.update(tipo_contenido=tipo, tamano_bytes=tamano)
+        return resultado, _validadores_de(response)
+    except HostCaido as e:
+        return {'url': url, 'status': 'ERROR', 'estado': 'ERROR', 'motivo': e.motivo, 'host_caido': e.host}, {}
+    except EscaneoDetenido:
+        raise  # no es un resultado del enlace: no se reporta ni se guarda en caché
+    except Exception as e:
+        resultado = resultado_por_status(url, None, e)
+        if salud is not None:
+            # Tras una redirección el que falla puede ser otro host: el de la petición fallida
+            fallida = getattr(getattr(e, 'request', None), 'url', None) or destino
+            motivo = salud.registrar_error(fallida, e)
+            if motivo:
+                resultado['motivo'] = motivo
+            if host_de(fallida) != host_de(destino):
+                salud.registrar_exito(destino)  # destino contestó: redirigió al host que falló
+        return resultado, {}
+    finally:
+        if salud is not None:
+            salud.soltar(destino)  # sin efecto si el host de destino ya quedó resuelto
+
+
+def _verificar_medido(url, tiempos, medir_peso=False, salud=None, detener=None, destino=None):
+    """verificar_enlace() con el desglose DNS/conexión/TLS/TTFB del enlace"""
+    with medir_enlace(url, tiempos):
+        return verificar_enlace(url, medir_peso=medir_peso, salud=salud, detener=detener, destino=destino)
+
+
+def iterar_verificaciones(enlaces, max_workers=None, tiempos=None, medir_peso=False, salud=None, detener=None,
+                          destinos=None):
+    """
+    Verifica los enlaces en paralelo y entrega cada resultado apenas termina.
+    Como máximo max_workers peticiones quedan en vuelo al mismo tiempo; los
+    enlaces se envían al pool a medida que se libera, no todos de entrada.
+    Con tiempos (TiemposEscaneo) registra los tiempos de cada enlace;
+    con medir_peso, el tipo y tamaño de cada uno (modo activos).
+    salud (SaludHosts) se comparte entre llamadas del mismo escaneo; si no
+    se indica, cada llamada usa una tabla nueva.
+    Con detener (threading.Event) deja de entregar resultados apenas se
+    activa: lo no enviado se cancela y no se espera a las peticiones en curso.
+    destinos ({enlace: URL a pedir}) separa la clave de cada resultado de la
+    URL que se pide (ver normalizacion.urls_de_peticion).
+    """
+    enlaces = list(enlaces)
+    if not enlaces:
+        return
+    workers = max(1, min(max_workers or MAX_WORKERS, len(enlaces)))
+    salud = salud if salud is not None else SaludHosts()
+    destinos = destinos or {}
+    restantes = iter(enlaces)
+    en_vuelo = set()
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            # Una tanda de reserva por worker para no dejar hilos ociosos entre resultados
+            for enlace in restantes:
+                en_vuelo.add(executor.submit(_verificar_medido, enlace, tiempos, medir_peso, salud, detener,
+                                             destinos.get(enlace)))
+                if len(en_vuelo) >= workers * 2:
+                    break
+            if not en_vuelo:
+                return
+            listos, en_vuelo = wait(en_vuelo, timeout=ESPERA_DETENER if detener is not None else None,
+                                    return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                if detener is not None and detener.is_set():
+                    return
+                resultado = futuro.result()
+                contar_resultado(resultado)
+                yield resultado
+            if detener is not None and detener.is_set():
+                return
+    finally:
+        # También si el consumidor abandona el generador: lo pendiente no se ejecuta
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ContadorEstadisticas:
+    """Acumula el resumen OK / rotos sin guardar los resultados"""
+
+    def __init__(self):
+        self.total = 0
+        self.rotos = 0
+        self.redirigidos = 0
+        self.cadenas_largas = 0
+
+    def agregar(self, resultado):
+        self.total += 1
+        if resultado['estado'] in ESTADOS_ROTOS:
+            self.rotos += 1
+        if resultado.get('redirecciones'):
+            self.redirigidos += 1
+            if resultado.get('cadena_larga'):
+                self.cadenas_largas += 1
+
+    def resumen(self):
+        porcentaje_rotos = (self.rotos / self.total * 100) if self.total > 0 else 0
+        return {
+            'total': self.total,
+            'ok': self.total - self.rotos,
+            'rotos': self.rotos,
+            'porcentaje_rotos': round(porcentaje_rotos, 2),
+            'redirigidos': self.redirigidos,
+            'cadenas_largas': self.cadenas_largas
+        }
+
+
+def calcular_estadisticas(resultados):
+    """Calcula el resumen de enlaces OK / rotos"""
+    contador = ContadorEstadisticas()
+    for resultado in resultados:
+        contador.agregar(resultado)
+    return contador.resumen()
@@ -1,13 +1,23 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response
 from datetime import datetime
+import json
 import os
+import queue
 import random
 
+from escritor_logs import obtener_escritor
+from ingesta import MAX_BYTES as INGEST_MAX_BYTES, LoteInvalido, formatear_entrada, parsear_lote, preparar_lote
+from lector_logs import leer_desde, leer_ultimas_lineas
+from vigilante_logs import obtener_difusor
+
 app = Flask(__name__)
 
 # Nombre del archivo de log
 LOG_FILE = 'server.log'
 
+# Segundos sin líneas nuevas tras los que el stream manda un comentario (mantiene viva la conexión)
+SSE_HEARTBEAT = float(os.getenv("LOG_SSE_HEARTBEAT", "15"))
+
 # Asegurar que el archivo de log existe al iniciar
 def init_log_file():
     """Crea el archivo de log si no existe"""
@@ -21,25 +31,18 @@ def init_log_file():
 # Función para escribir en el log
 def write_log(level, message):
     """Escribe una línea en el archivo de log"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    log_entry = f"[{timestamp}] [{level}] {message}\n"
+    log_entry = formatear_entrada(level, message)
     
-    with open(LOG_FILE, 'a') as f:
-        f.write(log_entry)
+    # Solo se encola: el escritor en segundo plano la agrega junto con las demás del lote
+    obtener_escritor(LOG_FILE).escribir(log_entry)
     
     return log_entry
 
 # Función para leer las últimas líneas del log
 def read_last_logs(n=15):
     """Lee las últimas N líneas del archivo de log"""
-    if not os.path.exists(LOG_FILE):
-        return []
-    
-    with open(LOG_FILE, 'r') as f:
-        lines = f.readlines()
-    
-    # Retorna las últimas N líneas (sin el salto de línea)
-    return [line.strip() for line in lines[-n:]]
+    # Busca desde el final: cada poll cuesta lo mismo aunque el log pese GB
+    return leer_ultimas_lineas(LOG_FILE, n)
 
 # Ruta principal - Dashboard
 @app.route('/')
@@ -50,9 +53,99 @@ def index():
 # Ruta para obtener logs (Polling)
 @app.route('/get_logs', methods=['GET'])
 def get_logs():
-    """Devuelve las últimas 15 líneas del log como JSON"""
-    logs = read_last_logs(15)
-    return jsonify({'logs': logs, 'count': len(logs)})
+    """
+    Devuelve las últimas 15 líneas del log como JSON y un cursor.
+    Con ?cursor=<cursor anterior> devuelve solo las líneas nuevas desde ese punto
+    (reset=true si el log se limpió o rotó y se lee desde el principio).
+    """
+    cursor = request.args.get('cursor')
+    try:
+        logs, nuevo_cursor, reiniciado = leer_desde(LOG_FILE, cursor or None, 15)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': f'Cursor inválido: {cursor}'}), 400
+    return jsonify({'logs': logs, 'count': len(logs), 'cursor': nuevo_cursor, 'reset': reiniciado})
+
+def evento_sse(lote):
+    """Lote de líneas como evento SSE; el cursor va como id para reanudar con Last-Event-ID"""
+    return f"id: {lote['cursor']}\nevent: logs\ndata: {json.dumps(lote)}\n\n"
+
+# Ruta para recibir logs en vivo (Server-Sent Events)
+@app.route('/stream_logs', methods=['GET'])
+def stream_logs():
+    """
+    Empuja las líneas nuevas del log apenas se escriben.
+    Primero envía las últimas 15 (o, al reconectar, lo que faltó desde
+    Last-Event-ID / ?cursor) y después un evento 'logs' por cada lote.
+    """
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('cursor') or None
+    difusor = obtener_difusor(LOG_FILE)
+    suscripcion, inicial = difusor.suscribir(cursor, 15)
+
+    def generar():
+        try:
+            yield 'retry: 2000\n' + evento_sse(inicial)
+            while True:
+                if suscripcion.atrasada:
+                    # El cliente no leyó a tiempo y se perdieron lotes: vuelve a empezar desde la cola
+                    yield evento_sse(difusor.resincronizar(suscripcion, 15))
+                    continue
+                try:
+                    lote = suscripcion.cola.get(timeout=SSE_HEARTBEAT)
+                except queue.Empty:
+                    yield ': ping\n\n'
+                    continue
+                yield evento_sse(lote)
+        finally:
+            difusor.cancelar(suscripcion)
+
+    return Response(generar(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def leer_cuerpo_limitado(max_bytes):
+    """Cuerpo de la petición o None si supera max_bytes (también sin Content-Length, con chunked)"""
+    if request.content_length is not None and request.content_length > max_bytes:
+        return None
+    partes = []
+    leidos = 0
+    while leidos <= max_bytes:
+        parte = request.stream.read(min(64 * 1024, max_bytes + 1 - leidos))
+        if not parte:
+            return b''.join(partes)
+        partes.append(parte)
+        leidos += len(parte)
+    return None
+
+# Ruta para recibir logs de otros servicios
+@app.route('/ingest', methods=['POST'])
+def ingest():
+    """
+    Recibe un lote de registros {"level", "message", "timestamp"?} como JSONL
+    (application/x-ndjson) o como arreglo JSON. Si todos son válidos se
+    agregan al log en una sola escritura; si no, no se escribe ninguno.
+    """
+    cuerpo = leer_cuerpo_limitado(INGEST_MAX_BYTES)
+    if cuerpo is None:
+        return jsonify({
+            'status': 'error',
+            'message': f'El lote supera {INGEST_MAX_BYTES} bytes'
+        }), 413
+    try:
+        registros = parsear_lote(cuerpo, request.content_type)
+        texto, cantidad = preparar_lote(registros)
+    except LoteInvalido as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Lote rechazado: {e.total} error(es)',
+            'errors': e.errores
+        }), 400
+    
+    obtener_escritor(LOG_FILE).escribir(texto)
+    
+    return jsonify({
+        'status': 'success',
+        'message': 'Lote registrado correctamente',
+        'count': cantidad
+    })
 
 # Ruta para simular un error crítico
 @app.route('/simulate_error', methods=['POST'])
@@ -134,9 +227,15 @@ def simulate_warning():
 def clear_logs():
     """Limpia el archivo de logs"""
     try:
-        with open(LOG_FILE, 'w') as f:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            f.write(f"[{timestamp}] [INFO] Logs cleared by user\n")
+        # Archivo nuevo en lugar de truncar: cambia el inodo y los cursores lo detectan
+        # aunque el log vuelva a crecer más allá de su offset. Lo hace el escritor,
+        # después de lo que ya estaba en cola, y sigue escribiendo en el archivo nuevo
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if not obtener_escritor(LOG_FILE).reemplazar(f"[{timestamp}] [INFO] Logs cleared by user\n"):
+            return jsonify({
+                'status': 'error',
+                'message': 'Error al limpiar logs: el escritor del log no respondió a tiempo'
+            }), 503
         
         return jsonify({
             'status': 'success',
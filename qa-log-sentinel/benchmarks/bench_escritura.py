@@ -0,0 +1,116 @@
+"""
+Benchmark de escritura del log
+Varios hilos escriben líneas con el formato de write_log() y se mide el
+rendimiento sostenido (líneas por segundo) de:
+
+  - abrir-cerrar: el write_log() anterior, que abre, agrega y cierra por línea
+  - escritor: EscritorLogs (cola + hilo que agrega por lotes), con cada
+    política de fsync
+
+Al final se verifica que el archivo tenga todas las líneas, completas.
+
+Uso:
+    python benchmarks/bench_escritura.py
+    python benchmarks/bench_escritura.py --lineas 200000 --hilos 1,8,32
+    python benchmarks/bench_escritura.py --json escritura.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from escritor_logs import EscritorLogs
+
+LINEA = "[2025-12-28 10:30:15] [ERROR] Critical Database Connection Failed #DB{:04d} hilo {}\n"
+
+
+def escribir_abriendo(ruta):
+    def escribir(texto):
+        with open(ruta, 'a') as f:
+            f.write(texto)
+    return escribir, lambda: None
+
+
+def escribir_con_escritor(fsync):
+    def preparar(ruta):
+        escritor = EscritorLogs(ruta, fsync=fsync)
+        return escritor.escribir, escritor.cerrar
+    return preparar
+
+
+def medir(preparar, ruta, lineas, hilos):
+    """Líneas por segundo hasta que todo quedó en el archivo"""
+    if os.path.exists(ruta):
+        os.remove(ruta)
+    escribir, terminar = preparar(ruta)
+    por_hilo = lineas // hilos
+    listos = threading.Barrier(hilos + 1)
+
+    def trabajar(numero):
+        listos.wait()
+        for i in range(por_hilo):
+            escribir(LINEA.format(i % 10000, numero))
+
+    trabajadores = [threading.Thread(target=trabajar, args=(n,)) for n in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    listos.wait()
+    inicio = time.perf_counter()
+    for t in trabajadores:
+        t.join()
+    terminar()
+    segundos = time.perf_counter() - inicio
+
+    with open(ruta, 'rb') as f:
+        escritas = f.read().split(b'\n')
+    assert escritas.pop() == b'', 'la última línea quedó incompleta'
+    assert len(escritas) == por_hilo * hilos, f'se esperaban {por_hilo * hilos} líneas y hay {len(escritas)}'
+    assert all(l.startswith(b'[2025-12-28') and b' hilo ' in l for l in escritas), 'hay líneas intercaladas'
+    return {'lineas_por_s': round(por_hilo * hilos / segundos), 'segundos': round(segundos, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lineas', type=int, default=50000, help='Líneas escritas por medición')
+    parser.add_argument('--hilos', default='1,8,32', help='Cantidades de hilos escritores a probar')
+    parser.add_argument('--directorio', default=tempfile.gettempdir(), help='Dónde escribir el log')
+    parser.add_argument('--json', help='Guardar los resultados en este archivo')
+    args = parser.parse_args()
+
+    variantes = [('abrir-cerrar', escribir_abriendo),
+                 ('escritor', escribir_con_escritor('nunca')),
+                 ('escritor+fsync periodico', escribir_con_escritor('periodico')),
+                 ('escritor+fsync lote', escribir_con_escritor('lote'))]
+    ruta = os.path.join(args.directorio, 'bench_escritura.log')
+    filas = []
+    print(f"{'variante':>26} {'hilos':>6} {'líneas/s':>12}")
+    try:
+        for hilos in [int(h) for h in args.hilos.split(',')]:
+            for nombre, preparar in variantes:
+                resultado = medir(preparar, ruta, args.lineas, hilos)
+                filas.append(dict(resultado, variante=nombre, hilos=hilos))
+                print(f"{nombre:>26} {hilos:>6} {resultado['lineas_por_s']:>12,}")
+    finally:
+        if os.path.exists(ruta):
+            os.remove(ruta)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'plataforma': platform.platform(),
+                'lineas': args.lineas,
+                'resultados': filas
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en {args.json}")
+
+
+if __name__ == '__main__':
+    main()
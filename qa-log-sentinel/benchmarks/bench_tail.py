@@ -0,0 +1,125 @@
+"""
+Benchmark de lectura del final del log
+Genera logs sintéticos de varios tamaños y mide cuánto cuesta un poll de
+/get_logs (las últimas N líneas) con:
+
+  - readlines: el lector anterior, que recorre todo el archivo
+  - bloques: búsqueda hacia atrás de a bloques (lector_logs)
+  - mmap: la misma búsqueda sobre el archivo mapeado en memoria
+
+El costo de bloques y mmap debe quedar constante aunque el log crezca.
+
+Uso:
+    python benchmarks/bench_tail.py
+    python benchmarks/bench_tail.py --tamanos-mb 100,1000,4000 --max-readlines-mb 1000
+    python benchmarks/bench_tail.py --json tail.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from lector_logs import leer_ultimas_lineas
+
+NIVELES = ('INFO', 'INFO', 'INFO', 'WARNING', 'ERROR')
+MENSAJES = ('User login successful', 'Health check passed', 'Slow database query detected (5.2s)',
+            'Critical Database Connection Failed #DB1234', 'API request processed successfully')
+
+
+def generar_log(ruta, tamano_mb):
+    """Escribe un log con el formato de write_log() hasta tamano_mb (reutiliza uno ya generado)"""
+    objetivo = tamano_mb * 1024 * 1024
+    if os.path.exists(ruta) and os.path.getsize(ruta) >= objetivo:
+        return
+    azar = random.Random(tamano_mb)
+    # Un bloque de ~1 MB repetido: generar GB línea a línea tardaría más que el benchmark
+    lineas = []
+    tamano = 0
+    while tamano < 1024 * 1024:
+        linea = f"[2025-12-28 10:30:{azar.randint(10, 59)}] [{azar.choice(NIVELES)}] {azar.choice(MENSAJES)}\n"
+        lineas.append(linea)
+        tamano += len(linea)
+    bloque = ''.join(lineas).encode('utf-8')
+    with open(ruta, 'wb') as f:
+        escritos = 0
+        while escritos < objetivo:
+            f.write(bloque)
+            escritos += len(bloque)
+
+
+def leer_con_readlines(ruta, n):
+    with open(ruta, 'r') as f:
+        lines = f.readlines()
+    return [line.strip() for line in lines[-n:]]
+
+
+def medir(funcion, repeticiones):
+    """Mediana y mejor tiempo en ms de N llamadas"""
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return resultado, {'ms_p50': round(statistics.median(tiempos), 4), 'ms_mejor': round(min(tiempos), 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanos-mb', default='1,10,100,1000', help='Tamaños de log a probar, en MB')
+    parser.add_argument('-n', '--lineas', type=int, default=15, help='Líneas pedidas por poll')
+    parser.add_argument('-r', '--repeticiones', type=int, default=200, help='Polls medidos por lector')
+    parser.add_argument('--max-readlines-mb', type=int, default=100,
+                        help='Tamaño máximo en el que se mide readlines (es lineal y lento)')
+    parser.add_argument('--directorio', default=tempfile.gettempdir(), help='Dónde generar los logs')
+    parser.add_argument('--conservar', action='store_true', help='No borrar los logs generados al terminar')
+    parser.add_argument('--json', help='Guardar los resultados en este archivo')
+    args = parser.parse_args()
+
+    tamanos = [int(t) for t in args.tamanos_mb.split(',')]
+    filas = []
+    print(f"{'log':>9} {'readlines':>14} {'bloques':>12} {'mmap':>12}   (ms por poll, p50)")
+    for tamano_mb in tamanos:
+        ruta = os.path.join(args.directorio, f'bench_tail_{tamano_mb}mb.log')
+        generar_log(ruta, tamano_mb)
+        try:
+            esperado, bloques = medir(lambda: leer_ultimas_lineas(ruta, args.lineas, usar_mmap=False),
+                                      args.repeticiones)
+            obtenido, con_mmap = medir(lambda: leer_ultimas_lineas(ruta, args.lineas, usar_mmap=True),
+                                       args.repeticiones)
+            assert obtenido == esperado, 'bloques y mmap no coinciden'
+            lineal = None
+            if tamano_mb <= args.max_readlines_mb:
+                # Pocas repeticiones: cada una recorre el archivo entero
+                referencia, lineal = medir(lambda: leer_con_readlines(ruta, args.lineas),
+                                           max(1, min(args.repeticiones, 1000 // tamano_mb)))
+                assert referencia == esperado, 'el lector por bloques difiere de readlines'
+        finally:
+            if not args.conservar:
+                os.remove(ruta)
+
+        filas.append({'tamano_mb': tamano_mb, 'readlines': lineal, 'bloques': bloques, 'mmap': con_mmap})
+        texto_lineal = f"{lineal['ms_p50']:>14.2f}" if lineal else f"{'(omitido)':>14}"
+        print(f"{tamano_mb:>6} MB {texto_lineal} {bloques['ms_p50']:>12.4f} {con_mmap['ms_p50']:>12.4f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'plataforma': platform.platform(),
+                'lineas': args.lineas,
+                'resultados': filas
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en {args.json}")
+
+
+if __name__ == '__main__':
+    main()
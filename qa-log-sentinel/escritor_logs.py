@@ -0,0 +1,231 @@
+"""
+Escritura del log en segundo plano
+write_log() solo encola la línea; un hilo escritor junta lo encolado en
+lotes (hasta LOG_WRITER_MAX_BYTES o LOG_WRITER_MAX_LATENCIA_MS) y lo
+agrega con una sola escritura sobre un único archivo abierto, así las
+líneas de distintos hilos nunca se intercalan.
+Si server.log se reemplaza o rota, el escritor lo reabre.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+MAX_BYTES = int(os.getenv("LOG_WRITER_MAX_BYTES", str(64 * 1024)))  # por escritura
+MAX_LATENCIA = float(os.getenv("LOG_WRITER_MAX_LATENCIA_MS", "20")) / 1000  # espera máxima de una línea
+# nunca: lo decide el sistema operativo · lote: después de cada escritura · periodico: cada FSYNC_SEGUNDOS
+FSYNC = os.getenv("LOG_WRITER_FSYNC", "periodico")
+FSYNC_SEGUNDOS = float(os.getenv("LOG_WRITER_FSYNC_SEGUNDOS", "1"))
+TIMEOUT = float(os.getenv("LOG_WRITER_TIMEOUT", "10"))  # espera máxima de vaciar() / reemplazar()
+
+_CERRAR = object()
+
+
+class _Barrera:
+    """Marca en la cola: se completa cuando todo lo anterior quedó escrito"""
+
+    def __init__(self, reemplazo=None):
+        self.reemplazo = reemplazo  # contenido nuevo del archivo (para /clear_logs)
+        self.hecho = threading.Event()
+        self.error = None
+
+
+class EscritorLogs:
+    """Escritor asíncrono de un archivo de log; seguro entre hilos"""
+
+    def __init__(self, ruta, max_bytes=MAX_BYTES, max_latencia=MAX_LATENCIA, fsync=FSYNC):
+        if fsync not in ('nunca', 'lote', 'periodico'):
+            raise ValueError(f"Política de fsync desconocida: {fsync}")
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.max_latencia = max_latencia
+        self.fsync = fsync
+        # SimpleQueue: put() no bloquea ni toma locks de Python; solo el escritor lee
+        self._cola = queue.SimpleQueue()
+        self._archivo = None
+        self._hilo = None
+        self._lock = threading.Lock()
+        self._sin_fsync = False
+        self._ultimo_fsync = time.monotonic()
+        self.escrituras = 0
+        self.lineas = 0
+
+    def escribir(self, texto):
+        """Encola texto (una o más líneas terminadas en \\n) y retorna enseguida"""
+        self._iniciar()
+        self._cola.put(texto)
+
+    def vaciar(self, timeout=TIMEOUT):
+        """Espera a que todo lo encolado hasta ahora esté escrito; False si vence el timeout"""
+        return self._barrera(_Barrera(), timeout)
+
+    def reemplazar(self, contenido, timeout=TIMEOUT):
+        """
+        Escribe lo pendiente y reemplaza el archivo por uno nuevo con contenido
+        (os.replace: cambia el inodo, los lectores por cursor lo detectan).
+        False si el escritor no lo hizo dentro de timeout.
+        """
+        return self._barrera(_Barrera(reemplazo=contenido), timeout)
+
+    def cerrar(self):
+        """Escribe lo pendiente y detiene el hilo"""
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+        if hilo is not None:
+            self._cola.put(_CERRAR)
+            hilo.join()
+
+    def _barrera(self, barrera, timeout):
+        self._iniciar()
+        self._cola.put(barrera)
+        if not barrera.hecho.wait(timeout):
+            return False
+        if barrera.error is not None:
+            raise barrera.error
+        return True
+
+    def _iniciar(self):
+        """Arranca el hilo escritor (o uno nuevo si el anterior terminó por un error)"""
+        if self._hilo is None or not self._hilo.is_alive():
+            with self._lock:
+                if self._hilo is None or not self._hilo.is_alive():
+                    self._hilo = threading.Thread(target=self._escribir_en_fondo, name='escritor-logs', daemon=True)
+                    self._hilo.start()
+
+    def _escribir_en_fondo(self):
+        while True:
+            try:
+                if not self._atender():
+                    return
+            except Exception as e:
+                # Un lote que falla no puede detener el log: se informa y se sigue con el próximo
+                print(f"❌ Error en el escritor de '{self.ruta}': {e!r}")
+
+    def _atender(self):
+        """Escribe el próximo lote de la cola; False cuando hay que cerrar"""
+        espera = FSYNC_SEGUNDOS if self._sin_fsync else None
+        try:
+            item = self._cola.get(timeout=espera)
+        except queue.Empty:
+            self._sincronizar(forzar=True)  # sin tráfico: no dejar datos sin fsync
+            return True
+
+        partes = []
+        tamano = 0
+        limite = time.monotonic() + self.max_latencia
+        while True:
+            if item is _CERRAR or isinstance(item, _Barrera):
+                self._volcar(partes)
+                partes, tamano = [], 0
+                if item is _CERRAR:
+                    try:
+                        self._cerrar_archivo()
+                    except Exception as e:
+                        print(f"❌ Error al cerrar '{self.ruta}': {e!r}")
+                    return False
+                self._completar(item)
+            else:
+                partes.append(item)
+                tamano += len(item)
+                if tamano >= self.max_bytes:
+                    break
+            # Junta lo que llegue hasta completar el lote o la latencia máxima de la primera línea
+            try:
+                item = self._cola.get_nowait()
+            except queue.Empty:
+                restante = limite - time.monotonic()
+                if not partes or restante <= 0:
+                    break
+                try:
+                    item = self._cola.get(timeout=restante)
+                except queue.Empty:
+                    break
+        self._volcar(partes)
+        return True
+
+    def _abrir(self):
+        """Archivo abierto en modo append; lo reabre si el del disco cambió (rotación)"""
+        if self._archivo is not None:
+            try:
+                if os.stat(self.ruta).st_ino == os.fstat(self._archivo.fileno()).st_ino:
+                    return self._archivo
+            except FileNotFoundError:
+                pass
+            self._cerrar_archivo()
+        self._archivo = open(self.ruta, 'ab', buffering=0)
+        return self._archivo
+
+    def _volcar(self, partes):
+        """Una sola escritura con todo el lote"""
+        if not partes:
+            return
+        try:
+            # backslashreplace: un carácter no codificable no hace perder el lote entero
+            datos = ''.join(partes).encode('utf-8', errors='backslashreplace')
+            archivo = self._abrir()
+            vista = memoryview(datos)
+            while vista:
+                vista = vista[archivo.write(vista):]
+            self.escrituras += 1
+            self.lineas += len(partes)
+            self._sin_fsync = True
+            self._sincronizar()
+        except Exception as e:
+            print(f"❌ No se pudieron escribir {len(partes)} entradas en '{self.ruta}': {e!r}")
+
+    def _sincronizar(self, forzar=False):
+        if not self._sin_fsync or self._archivo is None or self.fsync == 'nunca':
+            return
+        ahora = time.monotonic()
+        if self.fsync == 'lote' or forzar or ahora - self._ultimo_fsync >= FSYNC_SEGUNDOS:
+            os.fsync(self._archivo.fileno())
+            self._ultimo_fsync = ahora
+            self._sin_fsync = False
+
+    def _completar(self, barrera):
+        try:
+            if barrera.reemplazo is not None:
+                temporal = self.ruta + '.tmp'
+                with open(temporal, 'w', encoding='utf-8') as f:
+                    f.write(barrera.reemplazo)
+                os.replace(temporal, self.ruta)
+                self._cerrar_archivo()
+            elif self._archivo is not None:
+                self._sin_fsync = True
+                self._sincronizar(forzar=True)
+        except Exception as e:
+            barrera.error = e
+        finally:
+            barrera.hecho.set()
+
+    def _cerrar_archivo(self):
+        if self._archivo is not None:
+            try:
+                self._sincronizar(forzar=True)
+            finally:
+                self._archivo.close()
+                self._archivo = None
+
+
+_escritores = {}
+_lock_global = threading.Lock()
+
+
+def obtener_escritor(ruta):
+    """Escritor compartido del proceso para ruta (lo crea la primera vez)"""
+    with _lock_global:
+        escritor = _escritores.get(ruta)
+        if escritor is None:
+            escritor = _escritores[ruta] = EscritorLogs(ruta)
+        return escritor
+
+
+@atexit.register
+def _cerrar_escritores():
+    """Al salir del proceso no se pierde lo que quedó en cola"""
+    with _lock_global:
+        escritores = list(_escritores.values())
+    for escritor in escritores:
+        escritor.cerrar()
@@ -0,0 +1,133 @@
+"""
+Ingesta de logs por lotes
+Interpreta el cuerpo de POST /ingest (JSONL o un arreglo JSON de registros),
+valida cada registro y lo convierte en una línea con el formato de
+write_log(). El lote se acepta entero o se rechaza entero.
+"""
+
+from datetime import datetime
+import json
+import os
+
+MAX_REGISTROS = int(os.getenv("INGEST_MAX_REGISTROS", "10000"))  # por petición
+MAX_BYTES = int(os.getenv("INGEST_MAX_BYTES", str(5 * 1024 * 1024)))  # cuerpo de la petición
+MAX_LARGO_MENSAJE = int(os.getenv("INGEST_MAX_LARGO_MENSAJE", "4096"))
+MAX_ERRORES = 20  # errores informados en la respuesta
+
+NIVELES = ('INFO', 'WARNING', 'ERROR')
+FORMATO_FECHA = '%Y-%m-%d %H:%M:%S'
+TIPOS_JSONL = ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines')
+
+
+class LoteInvalido(Exception):
+    """El lote no se pudo interpretar o tiene registros inválidos"""
+
+    def __init__(self, errores):
+        super().__init__('; '.join(errores))
+        self.errores = errores[:MAX_ERRORES]
+        self.total = len(errores)
+
+
+def formatear_entrada(level, message, fecha=None):
+    """Línea del log: [fecha] [NIVEL] mensaje"""
+    timestamp = (fecha or datetime.now()).strftime(FORMATO_FECHA)
+    return f"[{timestamp}] [{level}] {message}\n"
+
+
+def parsear_lote(cuerpo, tipo=''):
+    """
+    Registros del cuerpo: un arreglo JSON, un objeto solo (lote de uno) o
+    JSONL, un objeto por línea (siempre que el Content-Type sea de JSONL).
+    """
+    try:
+        texto = cuerpo.decode('utf-8') if isinstance(cuerpo, bytes) else cuerpo
+    except UnicodeDecodeError:
+        raise LoteInvalido(['El cuerpo no es UTF-8 válido'])
+    texto = texto.lstrip('\ufeff').strip()
+    if not texto:
+        raise LoteInvalido(['El lote está vacío'])
+
+    registros = None
+    if (tipo or '').split(';')[0].strip().lower() not in TIPOS_JSONL:
+        try:
+            registros = json.loads(texto)
+        except ValueError as e:
+            if texto[0] == '[':
+                raise LoteInvalido([f'JSON inválido: {e}'])
+            # Varios objetos, uno por línea: es JSONL aunque no lo diga el Content-Type
+        if isinstance(registros, dict):
+            registros = [registros]
+        elif registros is not None and not isinstance(registros, list):
+            raise LoteInvalido(['Se esperaba un arreglo de registros o JSONL'])
+    if registros is None:
+        registros = []
+        errores = []
+        for numero, linea in enumerate(texto.splitlines(), 1):
+            if not linea.strip():
+                continue
+            try:
+                registros.append(json.loads(linea))
+            except ValueError as e:
+                errores.append(f'línea {numero}: JSON inválido ({e})')
+        if errores:
+            raise LoteInvalido(errores)
+
+    if len(registros) > MAX_REGISTROS:
+        raise LoteInvalido([f'El lote tiene {len(registros)} registros (máximo {MAX_REGISTROS})'])
+    return registros
+
+
+def _fecha(valor):
+    """Fecha del registro: ISO 8601 ('2025-12-28 10:30:15' incluido) o segundos epoch"""
+    if isinstance(valor, bool):
+        raise ValueError(valor)
+    if isinstance(valor, (int, float)):
+        return datetime.fromtimestamp(valor)
+    fecha = datetime.fromisoformat(str(valor).replace('Z', '+00:00'))
+    # Con zona horaria: a la hora local, como las líneas de write_log()
+    return fecha.astimezone().replace(tzinfo=None) if fecha.tzinfo else fecha
+
+
+def validar_registro(registro, ahora):
+    """Línea del log para un registro {'level', 'message', 'timestamp'?}; ValueError si no es válido"""
+    if not isinstance(registro, dict):
+        raise ValueError('se esperaba un objeto JSON')
+    level = registro.get('level', 'INFO')
+    if not isinstance(level, str) or level.upper() not in NIVELES:
+        raise ValueError(f"level debe ser uno de {', '.join(NIVELES)}")
+    message = registro.get('message')
+    if not isinstance(message, str) or not message.strip():
+        raise ValueError('falta message (texto no vacío)')
+    # Un registro es una línea: los saltos de línea no pueden inyectar entradas falsas
+    message = ' '.join(message.split())
+    if len(message) > MAX_LARGO_MENSAJE:
+        raise ValueError(f'message supera {MAX_LARGO_MENSAJE} caracteres')
+    try:
+        message.encode('utf-8')
+    except UnicodeEncodeError:
+        # Escapes \udXXX sueltos: JSON los acepta pero no son texto escribible en el log
+        raise ValueError('message no es texto UTF-8 válido')
+    fecha = ahora
+    if registro.get('timestamp') is not None:
+        try:
+            fecha = _fecha(registro['timestamp'])
+        except (ValueError, TypeError, OverflowError, OSError):
+            raise ValueError(f"timestamp inválido: {registro['timestamp']!r}")
+    return formatear_entrada(level.upper(), message, fecha)
+
+
+def preparar_lote(registros):
+    """Texto del lote listo para una sola escritura; LoteInvalido con los errores por registro"""
+    ahora = datetime.now()
+    lineas = []
+    errores = []
+    for indice, registro in enumerate(registros):
+        try:
+            lineas.append(validar_registro(registro, ahora))
+        except ValueError as e:
+            errores.append(f'registro {indice}: {e}')
+    if errores:
+        raise LoteInvalido(errores)
+    if not lineas:
+        raise LoteInvalido(['El lote está vacío'])
+    return ''.join(lineas), len(lineas)
@@ -0,0 +1,126 @@
+"""
+Lectura del final del log sin recorrer el archivo
+Busca hacia atrás desde el final, de a bloques (o con mmap), hasta juntar
+las N líneas pedidas: el costo depende del largo de esas líneas y no del
+tamaño de server.log.
+También lee de forma incremental desde un cursor 'inodo:offset', para que
+cada poll reciba solo las líneas agregadas desde el anterior.
+"""
+
+import mmap
+import os
+
+TAMANO_BLOQUE = int(os.getenv("LOG_TAIL_BLOQUE", str(8 * 1024)))  # 15 líneas suelen caber en uno
+USAR_MMAP = os.getenv("LOG_TAIL_MMAP", "0") == "1"
+MAX_BYTES_CURSOR = int(os.getenv("LOG_CURSOR_MAX_BYTES", str(1024 * 1024)))  # por respuesta
+
+
+def _inicio_por_bloques(f, fin, n, tamano_bloque):
+    """Posición desde la que los bytes finales contienen al menos n+1 saltos de línea (o 0)"""
+    pos = fin
+    saltos = 0
+    while pos > 0 and saltos <= n:
+        leer = min(tamano_bloque, pos)
+        pos -= leer
+        f.seek(pos)
+        saltos += f.read(leer).count(b'\n')
+    return pos
+
+
+def _inicio_por_mmap(mapa, fin, n):
+    """Igual que _inicio_por_bloques pero buscando los saltos en el mapa, sin copiar bloques"""
+    pos = fin
+    for _ in range(n + 1):
+        pos = mapa.rfind(b'\n', 0, pos)
+        if pos < 0:
+            return 0
+    return pos
+
+
+def _ultimas(datos, n):
+    # splitlines reconoce \n, \r\n y \r, como la lectura en modo texto
+    return [linea.decode('utf-8', errors='replace').strip() for linea in datos.splitlines()[-n:]]
+
+
+def leer_ultimas_lineas(ruta, n=15, usar_mmap=None, tamano_bloque=None):
+    """
+    Retorna las últimas n líneas de ruta (sin saltos de línea ni espacios en
+    los extremos), como readlines()[-n:] pero leyendo solo el final del archivo.
+    Si el archivo no existe retorna [].
+    """
+    usar_mmap = USAR_MMAP if usar_mmap is None else usar_mmap
+    if n <= 0:
+        return []
+    try:
+        f = open(ruta, 'rb')
+    except FileNotFoundError:
+        return []
+
+    with f:
+        return _ultimas_hasta(f, os.fstat(f.fileno()).st_size, n, usar_mmap, tamano_bloque)
+
+
+def _ultimas_hasta(f, fin, n, usar_mmap=False, tamano_bloque=None):
+    """Últimas n líneas del archivo abierto f entre el principio y el byte fin"""
+    if fin == 0 or n <= 0:
+        return []
+    if usar_mmap:
+        with mmap.mmap(f.fileno(), fin, access=mmap.ACCESS_READ) as mapa:
+            return _ultimas(mapa[_inicio_por_mmap(mapa, fin, n):fin], n)
+    inicio = _inicio_por_bloques(f, fin, n, tamano_bloque or TAMANO_BLOQUE)
+    f.seek(inicio)
+    return _ultimas(f.read(fin - inicio), n)
+
+
+def formatear_cursor(inodo, offset):
+    return f"{inodo}:{offset}"
+
+
+def parsear_cursor(texto):
+    """'inodo:offset' -> (inodo, offset); un offset solo -> (None, offset). ValueError si no es válido"""
+    inodo, _, offset = str(texto).strip().rpartition(':')
+    offset = int(offset)
+    if offset < 0:
+        raise ValueError('offset negativo')
+    return (int(inodo) if inodo else None), offset
+
+
+def leer_desde(ruta, cursor=None, n=15, max_bytes=None, hasta=None):
+    """
+    Líneas agregadas al log desde cursor. Retorna (lineas, cursor nuevo, reiniciado).
+
+    Sin cursor entrega las últimas n líneas. El archivo se lee desde el
+    principio (reiniciado=True) si cambió de inodo (rotación o /clear_logs)
+    o si es más corto que el offset (truncado en el lugar). Solo se entregan
+    líneas completas, hasta max_bytes por llamada: el cliente sigue desde
+    el cursor nuevo. hasta limita la lectura a ese offset del archivo.
+    """
+    max_bytes = max_bytes or MAX_BYTES_CURSOR
+    try:
+        f = open(ruta, 'rb')
+    except FileNotFoundError:
+        return [], None, cursor is not None
+
+    with f:
+        estado = os.fstat(f.fileno())
+        inodo, fin = estado.st_ino, estado.st_size
+        if hasta is not None:
+            fin = min(fin, hasta)
+        if cursor is None:
+            # La cola y el cursor salen del mismo tamaño: lo que llegue después va en el próximo poll
+            return _ultimas_hasta(f, fin, n, USAR_MMAP), formatear_cursor(inodo, fin), False
+
+        inodo_cliente, offset = parsear_cursor(cursor)
+        reiniciado = (inodo_cliente is not None and inodo_cliente != inodo) or offset > fin
+        if reiniciado:
+            offset = 0
+        if offset == fin:
+            return [], formatear_cursor(inodo, fin), reiniciado
+
+        f.seek(offset)
+        datos = f.read(min(fin - offset, max_bytes))
+        corte = datos.rfind(b'\n') + 1
+        if corte == 0 and len(datos) == max_bytes:
+            corte = len(datos)  # una línea más larga que max_bytes se entrega partida
+        lineas = [linea.decode('utf-8', errors='replace').strip() for linea in datos[:corte].splitlines()]
+        return lineas, formatear_cursor(inodo, offset + corte), reiniciado
@@ -0,0 +1,241 @@
+"""
+Difusión en vivo del log
+Un único hilo lector vigila server.log (inotify en Linux, consulta de
+os.stat en cualquier otro caso), lee una sola vez cada bloque de líneas
+agregado y lo reparte a las colas de todos los dashboards conectados.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import threading
+import time
+
+from lector_logs import MAX_BYTES_CURSOR, leer_desde, parsear_cursor
+
+MODO = os.getenv("LOG_WATCH_MODO", "auto")  # auto | inotify | stat
+INTERVALO = float(os.getenv("LOG_WATCH_INTERVALO", "0.25"))  # consulta de stat
+RELECTURA = float(os.getenv("LOG_WATCH_RELECTURA", "5"))  # red de seguridad con inotify
+MAX_LOTES_EN_COLA = int(os.getenv("LOG_SSE_MAX_LOTES", "1000"))  # por cliente
+
+# Eventos de inotify sobre el directorio: escrituras, reemplazos (/clear_logs) y rotaciones
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+MASCARA = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENTO = struct.Struct('iIII')  # wd, mask, cookie, len (+ nombre)
+
+
+class VigilanteStat:
+    """Detecta cambios comparando inodo, tamaño y mtime cada INTERVALO segundos"""
+
+    def __init__(self, ruta, intervalo=INTERVALO):
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self._ultimo = self._firma()
+
+    def _firma(self):
+        try:
+            estado = os.stat(self.ruta)
+        except FileNotFoundError:
+            return None
+        return estado.st_ino, estado.st_size, estado.st_mtime_ns
+
+    def esperar(self, timeout):
+        """Bloquea hasta un cambio o hasta timeout; True si hubo cambio"""
+        limite = time.monotonic() + timeout
+        while True:
+            firma = self._firma()
+            if firma != self._ultimo:
+                self._ultimo = firma
+                return True
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                return False
+            time.sleep(min(self.intervalo, restante))
+
+    def cerrar(self):
+        pass
+
+
+class VigilanteInotify:
+    """inotify sobre el directorio del log vía libc (sin dependencias); solo Linux"""
+
+    def __init__(self, ruta):
+        self.nombre = os.fsencode(os.path.basename(ruta))
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 falló')
+        if libc.inotify_add_watch(self._fd, os.fsencode(directorio), MASCARA) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f'inotify_add_watch falló en {directorio}')
+
+    def esperar(self, timeout):
+        """Bloquea hasta un evento sobre el log o hasta timeout; True si hubo cambio"""
+        limite = time.monotonic() + timeout
+        while True:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                return False
+            listos, _, _ = select.select([self._fd], [], [], restante)
+            if not listos:
+                return False
+            datos = os.read(self._fd, 64 * 1024)
+            pos = 0
+            while pos < len(datos):
+                _, _, _, largo = _EVENTO.unpack_from(datos, pos)
+                nombre = datos[pos + _EVENTO.size:pos + _EVENTO.size + largo].rstrip(b'\0')
+                pos += _EVENTO.size + largo
+                if nombre == self.nombre:
+                    return True
+
+    def cerrar(self):
+        os.close(self._fd)
+
+
+def crear_vigilante(ruta, modo=MODO):
+    """inotify si está disponible (o se pide), si no consulta de stat"""
+    if modo in ('auto', 'inotify'):
+        try:
+            return VigilanteInotify(ruta)
+        except (OSError, AttributeError) as e:
+            if modo == 'inotify':
+                raise
+            print(f"⚠️ inotify no disponible ({e}); vigilando {ruta} con stat cada {INTERVALO}s")
+    return VigilanteStat(ruta)
+
+
+class Suscripcion:
+    """Cola de lotes de un cliente; si se llena, el cliente se resincroniza"""
+
+    def __init__(self):
+        self.cola = queue.Queue(maxsize=MAX_LOTES_EN_COLA)
+        self.atrasada = False
+
+
+class DifusorLogs:
+    """
+    Lector único del log que reparte cada lote de líneas nuevas a todos los
+    suscriptores. Un lote es {'logs': [...], 'cursor': 'inodo:offset', 'reset': bool}.
+    """
+
+    def __init__(self, ruta, modo=MODO):
+        self.ruta = ruta
+        self.modo = modo
+        self.cursor = None
+        self._sin_archivo = False  # desapareció (rotación en curso): lo próximo es un reset
+        self._suscripciones = set()
+        self._lock = threading.Lock()
+        self._hilo = None
+        self.lecturas = 0  # lecturas del archivo con líneas nuevas (una por lote, no por cliente)
+
+    def _iniciar(self):
+        """Arranca el hilo lector con el primer suscriptor"""
+        if self._hilo is None:
+            _, self.cursor, _ = leer_desde(self.ruta, None, 0)
+            self.cursor = self.cursor or '0'  # aún no existe: leerlo entero cuando aparezca
+            self._hilo = threading.Thread(target=self._vigilar, name='difusor-logs', daemon=True)
+            self._hilo.start()
+
+    def _vigilar(self):
+        vigilante = crear_vigilante(self.ruta, self.modo)
+        try:
+            self.leer_nuevas()  # lo escrito mientras se armaba el vigilante
+            while True:
+                vigilante.esperar(RELECTURA)
+                self.leer_nuevas()
+        finally:
+            vigilante.cerrar()
+
+    def leer_nuevas(self):
+        """Lee lo agregado desde el último lote y lo publica (llamado por el hilo lector)"""
+        with self._lock:
+            self._leer_nuevas()
+
+    def _leer_nuevas(self):
+        while True:
+            lineas, cursor, reiniciado = leer_desde(self.ruta, self.cursor)
+            if cursor is None:
+                self._sin_archivo = self._sin_archivo or self.cursor != '0'
+                self.cursor = '0'
+                return
+            reiniciado = reiniciado or self._sin_archivo
+            self._sin_archivo = False
+            if not lineas and not reiniciado:
+                self.cursor = cursor
+                return
+            self.cursor = cursor
+            self.lecturas += 1
+            self._publicar({'logs': lineas, 'cursor': cursor, 'reset': reiniciado})
+
+    def _publicar(self, lote):
+        for suscripcion in self._suscripciones:
+            if suscripcion.atrasada:
+                continue
+            try:
+                suscripcion.cola.put_nowait(lote)
+            except queue.Full:
+                suscripcion.atrasada = True  # se resincroniza con la cola del log
+
+    def suscribir(self, cursor=None, n=15):
+        """
+        Registra un cliente. Retorna (suscripción, lote inicial): las líneas
+        desde cursor (reconexión) o las últimas n; los lotes siguientes llegan
+        por suscripcion.cola sin huecos ni repetidos.
+        """
+        with self._lock:
+            self._iniciar()
+            self._leer_nuevas()  # todos quedan en self.cursor; lo posterior va por las colas
+            suscripcion = Suscripcion()
+            self._suscripciones.add(suscripcion)
+            return suscripcion, self._lote_inicial(cursor, n)
+
+    def resincronizar(self, suscripcion, n=15):
+        """Vacía la cola de un cliente atrasado y le entrega de nuevo las últimas n líneas"""
+        with self._lock:
+            self._leer_nuevas()
+            while not suscripcion.cola.empty():
+                suscripcion.cola.get_nowait()
+            suscripcion.atrasada = False
+            return dict(self._lote_inicial(None, n), reset=True)
+
+    def cancelar(self, suscripcion):
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    def _lote_inicial(self, cursor, n):
+        """Líneas hasta self.cursor (con el lock tomado)"""
+        actual = parsear_cursor(self.cursor)
+        if cursor is not None:
+            try:
+                inodo, offset = parsear_cursor(cursor)
+            except ValueError:
+                inodo, offset = None, None
+            # Mismo archivo y poco atraso: solo lo que le falta; si no, la cola del log
+            if offset is not None and inodo == actual[0] and 0 <= actual[1] - offset <= MAX_BYTES_CURSOR:
+                lineas, _, _ = leer_desde(self.ruta, cursor, n, hasta=actual[1])
+                return {'logs': lineas, 'cursor': self.cursor, 'reset': False}
+        lineas, _, _ = leer_desde(self.ruta, None, n, hasta=actual[1])
+        return {'logs': lineas, 'cursor': self.cursor, 'reset': cursor is not None}
+
+
+_difusores = {}
+_lock_global = threading.Lock()
+
+
+def obtener_difusor(ruta):
+    """Difusor compartido del proceso para ruta (lo crea la primera vez)"""
+    with _lock_global:
+        difusor = _difusores.get(ruta)
+        if difusor is None:
+            difusor = _difusores[ruta] = DifusorLogs(ruta)
+        return difusor